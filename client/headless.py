@@ -0,0 +1,100 @@
+import argparse
+import json
+import re
+import signal
+import threading
+
+from src.app_controller import AmbilightApp
+from src.control_server import ControlServer, default_address, send_commands
+from src.models import AppMode
+
+
+def device_name(value):
+    """Device names end up in file names (config-<name>.json)"""
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", value):
+        raise argparse.ArgumentTypeError("use letters, digits, '-' and '_' only")
+    return value
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Ambilight without GUI or tray, controlled over a local socket"
+    )
+    parser.add_argument(
+        "--socket", help="Unix socket path (default: <tmp>/ambilight.sock)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="Use loopback TCP on this port (token protected, see control_server)",
+    )
+    parser.add_argument(
+        "--device",
+        action="append",
+        type=device_name,
+        help="Drive a named device with its own config-<name>.json "
+        "(repeat for several, the first one is the default)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["off", "ambilight", "rainbow", "static"],
+        help="Mode to start in",
+    )
+    parser.add_argument(
+        "--send",
+        metavar="JSON",
+        help="Send a command (or a JSON list of commands) to a running instance",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.port:
+        address = ("127.0.0.1", args.port)
+    else:
+        address = args.socket or default_address()
+
+    # Client mode: talk to an already running daemon and exit
+    if args.send:
+        print(json.dumps(send_commands(json.loads(args.send), address), indent=2))
+        raise SystemExit(0)
+
+    # 1. Initialize the Core Application Logic (no Tk, no pystray),
+    #    one pipeline and config file per device
+    apps = {}
+    for name in dict.fromkeys(args.device or [None]):
+        print(f"[Headless] Initializing Core App ({name or 'default'})...")
+        apps[name or "default"] = AmbilightApp(name)
+    for app_logic in apps.values():
+        app_logic.start_worker_thread()
+
+    # 2. Local control API
+    server = ControlServer(apps, address).start()
+
+    # 3. Run until SIGINT/SIGTERM or a 'stop' command for any device
+    stop_event = threading.Event()
+    for app_logic in apps.values():
+        app_logic.register_observer(
+            lambda mode: stop_event.set() if mode == AppMode.EXIT else None
+        )
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    if args.mode:
+        for app_logic in apps.values():
+            app_logic.set_mode(AppMode[args.mode.upper()])
+
+    while not stop_event.wait(1.0):
+        pass
+
+    # 4. Cleanup
+    print("[Headless] Shutting down...")
+    server.stop()
+    for app_logic in apps.values():
+        app_logic.stop_all()
+    for app_logic in apps.values():
+        if app_logic.led_thread:
+            app_logic.led_thread.join(timeout=3)
+    print("[Headless] Goodbye.")
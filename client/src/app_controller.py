@@ -1,10 +1,13 @@
 import threading
 import time
+from src.auto_suspend import AutoSuspend
 from src.config_manager import ConfigManager
+from src.frame_buffer import FrameBuffer
+from src.frame_tracer import FrameTracer
 from src.screen_grabber import ScreenGrabber
+from src.transmitters.recording_transmitter import RecordingTransmitter
 from src.transmitters.serial_transmitter import SerialTransmitter
 from src.transmitters.udp_transmitter import UdpTransmitter
-from src.system_tray import SystemTray
 from src.models import AppMode
 
 
@@ -13,14 +16,65 @@ class AmbilightApp:
     Main Application Controller (State Machine Version).
     """
 
-    def __init__(self):
+    def __init__(self, device=None):
         # --- Component Initialization ---
         print("[Main] Initializing ConfigManager...")
-        self.config_mgr = ConfigManager()
+        self.config_mgr = ConfigManager(device)
         self.config_mgr.load_local_config()
         self.config_mgr.sync_with_esp()
 
-        # --- Transmitter Factory Logic ---
+        self.serial_comm = self._build_transmitter()
+
+        print("[Main] Initializing Screen Grabber...")
+        self.grabber = ScreenGrabber(self.config_mgr)
+
+        # Optional: per-frame latency tracing, exported when the worker stops
+        self.trace_path = self.config_mgr.get_nested("client", "trace_path")
+        self.tracer = FrameTracer() if self.trace_path else None
+        self.grabber.tracer = self.tracer
+
+        # --- State Management ---
+        self.current_mode = AppMode.OFF  # The Single Source of Truth
+        self.should_exit = False
+        self._observers = []  # List of GUI listeners
+
+        # Latest sent frame, read by the GUI preview
+        self.frame_buffer = FrameBuffer()
+
+        # Wakes the worker on mode/config changes and shutdown (no polling)
+        self._wake = threading.Event()
+        self.config_mgr.add_listener(lambda snapshot: self._wake.set())
+
+        # Connection settings changed, the worker swaps the transmitter
+        self._transmitter_lock = threading.Lock()
+        self._transmitter_stale = False
+        self._swapping = False
+        self._pending_command = None  # set_mode() while reconnecting
+        self.config_mgr.subscribe("transmitter", self._on_transmitter_changed)
+
+        # Pauses capture on lock screen / black or frozen picture
+        if self.config_mgr.get_nested("client", "auto_suspend", True):
+            self.suspend = AutoSuspend()
+        else:
+            self.suspend = None
+
+        # Counters for get_stats(), the worker only increments them
+        self.frames_sent = 0
+        self._stats_mark = (time.monotonic(), 0)
+
+        self.led_thread = None
+        self.tray_thread = None
+        self.tray = None
+
+    # ==========================================
+    #           Transmitter Factory
+    # ==========================================
+
+    def _build_transmitter(self, recorder=None):
+        """
+        Creates the transmitter described by the current config.
+        'recorder' is a running FrameRecorder to keep (not restart).
+        """
         conn_type = str(
             self.config_mgr.get_nested("client", "connection_type", "serial")
         )
@@ -32,27 +86,79 @@ class AmbilightApp:
             udp_port = int(self.config_mgr.get_nested("network", "udp_port") or 8888)
 
             print(f"[Main] Initializing UDP Transmitter ({host}:{udp_port})...")
-            self.serial_comm = UdpTransmitter(host, udp_port)
+            transmitter = UdpTransmitter(host, udp_port)
 
         else:
             # Fallback to Serial
             com_port = str(self.config_mgr.get_nested("client", "com_port") or "COM3")
             baud = int(self.config_mgr.get_nested("hardware", "baud_rate") or 115200)
+            high_speed = bool(self.config_mgr.get_nested("client", "serial_high_speed"))
+            lossy = bool(self.config_mgr.get_nested("client", "serial_lossy"))
+            flow = bool(self.config_mgr.get_nested("client", "serial_flow_control"))
+            window = int(self.config_mgr.get_nested("client", "serial_flow_window", 2))
 
             print(f"[Main] Initializing Serial Transmitter ({com_port})...")
-            self.serial_comm = SerialTransmitter(port=com_port, baud_rate=baud)
+            transmitter = SerialTransmitter(
+                port=com_port,
+                baud_rate=baud,
+                high_speed=high_speed,
+                allow_lossy=lossy,
+                flow_control=flow,
+                flow_window=window,
+            )
 
-        print("[Main] Initializing Screen Grabber...")
-        self.grabber = ScreenGrabber(self.config_mgr)
+        # Optional: record everything sent to the strip for later replay
+        record_path = self.config_mgr.get_nested("client", "record_path")
+        if record_path:
+            if recorder is not None and recorder.path == record_path:
+                transmitter = RecordingTransmitter(transmitter, record_path, recorder)
+            else:
+                print(f"[Main] Recording LED frames to {record_path}")
+                transmitter = RecordingTransmitter(transmitter, record_path)
 
-        # --- State Management ---
-        self.current_mode = AppMode.OFF  # The Single Source of Truth
-        self.should_exit = False
-        self._observers = []  # List of GUI listeners
+        return transmitter
 
-        self.led_thread = None
-        self.tray_thread = None
-        self.tray = None
+    def _on_transmitter_changed(self, snapshot):
+        self._transmitter_stale = True
+        self._wake.set()
+
+    def _swap_transmitter(self):
+        """
+        Worker thread only: replaces the transmitter after a config change.
+        The lock is held only to release the old port and to swap in the
+        new one; connecting (ESP reset, handshakes) runs outside of it.
+        A set_mode() in between is queued and sent to the new device.
+        """
+        self._transmitter_stale = False
+        print("[Main] Connection settings changed, reconnecting...")
+
+        with self._transmitter_lock:
+            self._swapping = True
+            old = self.serial_comm
+            recorder = None
+
+            # The old port has to be released before a new one can open it
+            if isinstance(old, RecordingTransmitter):
+                recorder = old.recorder
+                old.transmitter.disconnect()
+            else:
+                old.disconnect()
+
+        new = old  # Stays (disconnected) if building the new one fails
+        try:
+            new = self._build_transmitter(recorder)
+            if recorder is not None and (
+                not isinstance(new, RecordingTransmitter)
+                or new.recorder is not recorder
+            ):
+                recorder.close()  # record_path changed or was removed
+        finally:
+            with self._transmitter_lock:
+                self.serial_comm = new
+                self._swapping = False
+                command, self._pending_command = self._pending_command, None
+                if command is not None:
+                    self.serial_comm.send_command(command)
 
     # ==========================================
     #           Observer Pattern
@@ -82,6 +188,9 @@ class AmbilightApp:
             print("[Main] Worker (LEDs) thread started.")
 
     def start_tray_thread(self):
+        # Imported here so headless runs never load pystray
+        from src.system_tray import SystemTray
+
         self.tray = SystemTray(self)
         self.tray_thread = threading.Thread(target=self.tray.run)
         self.tray_thread.daemon = True
@@ -91,6 +200,9 @@ class AmbilightApp:
     def stop_all(self):
         print("[Main] Stopping all threads...")
         self.should_exit = True
+        self._wake.set()
+        self.config_mgr.flush()
+        self.grabber.close()
         if self.tray:
             self.tray.stop()
 
@@ -101,27 +213,82 @@ class AmbilightApp:
     def worker_logic(self):
         print("[Worker] Logic loop started.")
 
-        total_leds = int(self.config_mgr.get_nested("hardware", "num_leds") or 60)
-        black_frame = b"\x00" * (total_leds * 3)
+        snapshot = self.config_mgr.snapshot
+        black_frame = b"\x00" * (snapshot.num_leds * 3)
         lights_physically_off = False
 
+        tracer = self.tracer
+        suspend = self.suspend
+
         while not self.should_exit:
+            # Wake-ups already handled by reading mode/snapshot below. Only
+            # events from here on may end a suspend pause or an idle wait.
+            self._wake.clear()
+
+            # One lock-free snapshot per frame, updates publish a new one
+            latest = self.config_mgr.snapshot
+            if latest is not snapshot:
+                snapshot = latest
+                black_frame = b"\x00" * (snapshot.num_leds * 3)
+
+            if self._transmitter_stale:
+                self._swap_transmitter()
+                lights_physically_off = False
+
             if self.current_mode == AppMode.AMBILIGHT:
-                frame = self.grabber.get_frame_bytes()
-                if frame:
-                    self.serial_comm.send_colors(frame)
+                if suspend is not None and suspend.suspended:
+                    # Paused: sleep until the next probe, wake early on changes
+                    self.grabber.pause_watcher()
+                    if self._wake.wait(suspend.probe_interval):
+                        self._wake.clear()
+                        suspend.reset()
+                        continue
+                    if suspend.reason == "screen locked" and suspend.screen_locked():
+                        continue
+                else:
+                    self.grabber.resume_watcher()
+
+                if tracer is not None:
+                    tracer.begin_frame()
+
+                frame = self.grabber.get_frame_bytes(snapshot)
+                if frame and suspend is not None:
+                    if suspend.observe(frame):
+                        frame = None  # Just suspended, nothing to send
+                    elif tracer is not None:
+                        tracer.mark("suspend")
+
+                if frame and self.serial_comm.send_colors(frame):
+                    self.frame_buffer.publish(frame, snapshot.layout)
+                    self.frames_sent += 1
                     lights_physically_off = False
+                    if tracer is not None:
+                        tracer.mark("transmit")
+                        tracer.end_frame()
+                elif tracer is not None:
+                    tracer.discard_frame()
 
             else:
                 # In any other mode (OFF, RAINBOW, STATIC), PC stops sending data
                 if not lights_physically_off:
-                    self.serial_comm.send_colors(black_frame)
+                    if self.serial_comm.send_colors(black_frame):
+                        self.frame_buffer.publish(black_frame, snapshot.layout)
                     lights_physically_off = True
 
-                time.sleep(0.5)
+                # Sleep until set_mode / config change / shutdown wakes us
+                self.grabber.pause_watcher()
+                self._wake.wait()
+                self._wake.clear()
+                if suspend is not None:
+                    suspend.reset()
 
         self.serial_comm.send_colors(black_frame)
         self.serial_comm.disconnect()
+
+        if tracer is not None:
+            print(f"[Trace] Stage latency: {tracer.stats()}")
+            tracer.export_chrome_trace(self.trace_path)
+
         print("[Worker] Logic loop finished.")
 
     # ==========================================
@@ -156,11 +323,16 @@ class AmbilightApp:
         elif new_mode == AppMode.OFF:
             cmd = {"cmd": "mode", "value": "off"}
 
-        # Send the command to ESP
-        self.serial_comm.send_command(cmd)
+        # Send the command to ESP (after the reconnect if one is running)
+        with self._transmitter_lock:
+            if self._swapping:
+                self._pending_command = cmd
+            else:
+                self.serial_comm.send_command(cmd)
 
         # Update State & Notify
         self.current_mode = new_mode
+        self._wake.set()
         self._notify_observers()
 
     def toggle(self):
@@ -172,9 +344,37 @@ class AmbilightApp:
             self.set_mode(AppMode.OFF)
             return "OFF"
 
+    def reload_config(self):
+        """
+        Re-reads config.json. Only subsystems whose settings differ are
+        notified, the worker picks the rest up on its next frame.
+        """
+        print("[App] Reloading config...")
+        self.config_mgr.load_local_config()
+
+    def get_stats(self):
+        """Cheap status summary, FPS is averaged since the previous call"""
+        now = time.monotonic()
+        frames = self.frames_sent
+        last_time, last_frames = self._stats_mark
+        self._stats_mark = (now, frames)
+        elapsed = now - last_time
+
+        stats = {
+            "mode": self.current_mode.name.lower(),
+            "fps": round((frames - last_frames) / elapsed, 1) if elapsed > 0 else 0.0,
+            "frames_sent": frames,
+            "config_generation": self.config_mgr.snapshot.generation,
+            "suspended": self.suspend.reason if self.suspend else None,
+        }
+        if self.tracer is not None:
+            stats["latency"] = self.tracer.stats()
+        return stats
+
     def stop(self):
         """Called when user requests total exit (e.g., from Tray)"""
         print("[App] Total exit requested.")
         self.current_mode = AppMode.EXIT
+        self._wake.set()
         self._notify_observers()
         self.stop_all()
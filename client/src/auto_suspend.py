@@ -0,0 +1,144 @@
+import sys
+import time
+
+import numpy as np
+
+
+def is_screen_locked():
+    """
+    Best effort lock screen detection.
+    On Windows the input desktop can't be opened while the lock screen
+    (or UAC prompt) is active. Other platforms report unlocked.
+    """
+    if sys.platform != "win32":
+        return False
+    try:
+        import ctypes
+
+        user32 = ctypes.windll.user32  # type: ignore[attr-defined]
+        desktop = user32.OpenInputDesktop(0, False, 0x0100)  # DESKTOP_SWITCHDESKTOP
+        if not desktop:
+            return True
+        user32.CloseDesktop(desktop)
+        return False
+    except (AttributeError, OSError):
+        return False
+
+
+class AutoSuspend:
+    """
+    Decides when screen capture can pause while in Ambilight mode:
+      * the screen is locked
+      * the source has been black for 'black_timeout' seconds
+      * nothing changed for 'static_timeout' seconds
+    While suspended the worker only probes every 'probe_interval'
+    seconds and resumes on the first frame that differs.
+    Channel changes up to 'noise_level' (dithering, capture noise)
+    don't count as a change.
+    """
+
+    def __init__(
+        self,
+        black_timeout=10.0,
+        static_timeout=120.0,
+        black_level=8,
+        noise_level=2,
+        probe_interval=0.25,
+        lock_check_interval=1.0,
+    ):
+        self.black_timeout = black_timeout
+        self.static_timeout = static_timeout
+        self.black_level = black_level
+        self.noise_level = noise_level
+        self.probe_interval = probe_interval
+        self.lock_check_interval = lock_check_interval
+
+        self.reason = None  # None while running
+        self._last_frame = None
+        self._black_since = None
+        self._static_since = None
+        self._lock_checked = 0.0
+        self._locked = False
+
+    @property
+    def suspended(self):
+        return self.reason is not None
+
+    def reset(self):
+        """Resume immediately (mode or config changed)"""
+        if self.reason is not None:
+            print(f"[Suspend] Resuming capture (was: {self.reason})")
+        self.reason = None
+        self._last_frame = None
+        self._black_since = None
+        self._static_since = None
+
+    def screen_locked(self, now=None):
+        """Cached lock check, the OS call runs at most once per interval"""
+        if now is None:
+            now = time.monotonic()
+        if now - self._lock_checked >= self.lock_check_interval:
+            self._lock_checked = now
+            self._locked = is_screen_locked()
+        return self._locked
+
+    def observe(self, frame, now=None):
+        """
+        Feeds a sampled LED frame. Returns True when capture is suspended
+        and the frame doesn't need to be sent.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        if self.screen_locked(now):
+            return self._suspend("screen locked")
+
+        leds = np.frombuffer(frame, dtype=np.uint8)
+        is_black = not leds.size or int(leds.max()) <= self.black_level
+        changed = self._changed(leds)
+        if changed or self._last_frame is None:
+            self._last_frame = leds
+
+        # Resume as soon as the reason for pausing is gone
+        if (
+            self.reason == "screen locked"
+            or (self.reason == "black screen" and not is_black)
+            or (self.reason == "no change" and changed)
+        ):
+            print(f"[Suspend] Resuming capture (was: {self.reason})")
+            self.reason = None
+            self._static_since = now
+
+        if changed or self._static_since is None:
+            self._static_since = now
+
+        # Any LED above the black level counts as picture
+        if not is_black:
+            self._black_since = None
+        elif self._black_since is None:
+            self._black_since = now
+
+        if self.reason is not None:
+            return True
+        if (
+            self._black_since is not None
+            and now - self._black_since >= self.black_timeout
+        ):
+            return self._suspend("black screen")
+        if now - self._static_since >= self.static_timeout:
+            return self._suspend("no change")
+        return False
+
+    def _changed(self, leds):
+        """Compared to the last frame that counted as a change"""
+        last = self._last_frame
+        if last is None or last.shape != leds.shape:
+            return True
+        diff = np.abs(leds.astype(np.int16) - last)
+        return bool(diff.max(initial=0) > self.noise_level)
+
+    def _suspend(self, reason):
+        if self.reason != reason:
+            print(f"[Suspend] Pausing capture: {reason}")
+        self.reason = reason
+        return True
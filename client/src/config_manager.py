@@ -3,10 +3,63 @@ import os
 import requests
 import sys
 import copy
+import stat
+import tempfile
+import threading
+import time
+
+from src.models import ConfigSnapshot
+
+# Which subsystem has to react when a setting changes
+KEY_GROUPS = {
+    "grabber": {
+        ("hardware", "num_leds"),
+        ("client", "monitor_index"),
+        ("client", "gamma"),
+        ("client", "depth"),
+        ("client", "layout"),
+        ("client", "dithering"),
+    },
+    "transmitter": {
+        ("client", "connection_type"),
+        ("client", "com_port"),
+        ("client", "serial_high_speed"),
+        ("client", "serial_lossy"),
+        ("client", "serial_flow_control"),
+        ("client", "serial_flow_window"),
+        ("client", "record_path"),
+        ("hardware", "baud_rate"),
+        ("network", "hostname"),
+        ("network", "udp_port"),
+    },
+    "smoothing": {
+        ("client", "smoothing"),
+        ("client", "scene_cut_threshold"),
+        ("hardware", "smoothing_speed"),
+    },
+}
+
+# Seconds of quiet before dirty settings are written to disk
+SAVE_DELAY = 1.0
+
+# The umask can only be read by setting it (process wide), so do it once
+# at import instead of on every save while other threads run
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path):
+    """Permissions of an existing file, else what open() would have used"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
 
 
 class ConfigManager:
-    def __init__(self):
+    def __init__(self, device=None):
+        # Extra devices keep their settings in config-<device>.json
+        self.device = device
         self.default_config = {
             "network": {
                 "hostname": "ambilight",
@@ -32,6 +85,172 @@ class ConfigManager:
         }
         self.config = copy.deepcopy(self.default_config)
 
+        # --- Snapshot Publishing ---
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.snapshot = None
+        self._listeners = []  # Called with every new snapshot
+        self._subscribers = {group: [] for group in KEY_GROUPS}
+        self.publish()
+
+        # --- Debounced Persistence ---
+        self._dirty = set()  # (section, key) changed since the last save
+        self._save_deadline = None  # monotonic time of the next save
+        self._save_cond = threading.Condition(self._lock)
+        self._save_lock = threading.Lock()  # Keeps writes in order
+        self._saver = None  # Started on the first change
+        self.save_delay = SAVE_DELAY
+
+    def add_listener(self, callback):
+        """Registers a callback(snapshot) fired after every publish"""
+        self._listeners.append(callback)
+
+    def subscribe(self, group, callback):
+        """
+        Registers a callback(snapshot) fired only when a key of 'group'
+        (see KEY_GROUPS) changed. Runs on the thread that made the change,
+        so callbacks should just flag work for their own thread.
+        """
+        self._subscribers[group].append(callback)
+
+    @staticmethod
+    def _build_snapshot(config, generation):
+        """Raises ValueError/TypeError/AttributeError on malformed values"""
+        client = config.get("client", {})
+        hardware = config.get("hardware", {})
+        layout = client.get("layout", {})
+
+        smoothing = float(client.get("smoothing", 0.0))
+        if not 0.0 <= smoothing < 1.0:
+            raise ValueError(f"smoothing must be in [0, 1), got {smoothing}")
+        scene_cut_threshold = float(client.get("scene_cut_threshold", 40.0))
+        if not scene_cut_threshold >= 0.0:
+            raise ValueError(
+                f"scene_cut_threshold must be >= 0, got {scene_cut_threshold}"
+            )
+
+        return ConfigSnapshot(
+            generation=generation,
+            num_leds=int(hardware.get("num_leds", 60)),
+            monitor_index=int(client.get("monitor_index", 1)),
+            gamma=float(client.get("gamma", 2.2)),
+            depth=int(client.get("depth", 100)),
+            layout=tuple(
+                int(layout.get(side, 0)) for side in ("left", "top", "right", "bottom")
+            ),
+            smoothing=smoothing,
+            scene_cut_threshold=scene_cut_threshold,
+            dithering=bool(client.get("dithering", True)),
+        )
+
+    def publish(self, changed=None):
+        """
+        Builds a new immutable snapshot from the current config and swaps it in.
+        The swap is a single reference assignment, so readers never see a
+        half applied update.
+        'changed' is the set of (section, key) that changed, None means all.
+        """
+        with self._lock:
+            self.generation += 1
+            self.snapshot = self._build_snapshot(self.config, self.generation)
+            snapshot = self.snapshot
+
+        for callback in self._listeners:
+            callback(snapshot)
+
+        for group, keys in KEY_GROUPS.items():
+            if changed is None or keys & changed:
+                for callback in self._subscribers[group]:
+                    callback(snapshot)
+        return snapshot
+
+    def set_nested(self, section, key, value):
+        """
+        Updates one setting, publishes a new snapshot and schedules a save.
+        Cheap enough to call on every slider tick.
+        Raises ValueError (and changes nothing) if the value is invalid.
+        Usage: cfg.set_nested("client", "gamma", 2.4)
+        """
+        changed = self._apply({section: {key: value}}, [section])
+        if changed:
+            self.mark_dirty(changed)
+            return self.publish(changed)
+        return self.snapshot
+
+    def _coerce(self, section, key, value):
+        """Numbers arriving as strings (JSON, UI fields) take the default's type"""
+        default = self.default_config.get(section, {}).get(key)
+        if isinstance(default, (int, float)) and not isinstance(default, bool):
+            return type(default)(value)
+        return value
+
+    def _apply(self, data, sections):
+        """
+        Merges {section: {key: value}} into the config, returns changed keys.
+        The result is validated on a copy first, so a bad value raises
+        ValueError and leaves the config untouched.
+        """
+        with self._lock:
+            candidate = dict(self.config)
+            changed = set()
+            try:
+                for section in sections:
+                    values = data.get(section)
+                    if not isinstance(values, dict):
+                        continue
+                    current = candidate[section] = dict(candidate.get(section, {}))
+                    for key, value in values.items():
+                        value = self._coerce(section, key, value)
+                        if current.get(key) != value:
+                            current[key] = value
+                            changed.add((section, key))
+                self._build_snapshot(candidate, self.generation)
+            except (AttributeError, TypeError, ValueError) as e:
+                raise ValueError(f"Invalid setting: {e}") from e
+
+            self.config = candidate
+        return changed
+
+    # ==========================================
+    #           Persistence
+    # ==========================================
+
+    def mark_dirty(self, keys):
+        """Remembers changed keys and pushes the debounced save back"""
+        with self._lock:
+            self._dirty |= keys
+            self._save_deadline = time.monotonic() + self.save_delay
+            if self._saver is None:
+                self._saver = threading.Thread(target=self._save_loop)
+                self._saver.daemon = True
+                self._saver.start()
+            self._save_cond.notify()
+
+    def _save_loop(self):
+        """Saver thread: writes once no change arrived for 'save_delay'"""
+        while True:
+            with self._lock:
+                while True:
+                    if self._save_deadline is None:
+                        self._save_cond.wait()
+                        continue
+                    remaining = self._save_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._save_cond.wait(remaining)
+            self.flush()
+
+    def flush(self):
+        """Writes pending changes now (called by the saver and on exit)"""
+        with self._save_lock:
+            with self._lock:
+                self._save_deadline = None
+                if not self._dirty:
+                    return
+                self._dirty.clear()
+                data = copy.deepcopy(self.config)
+            self._save_local_config(data)
+
     def get_local_path(self):
         """Finds the correct path for config.json (Works for Dev and Exe)"""
         if getattr(sys, "frozen", False):
@@ -41,19 +260,42 @@ class ConfigManager:
             base_path = os.path.dirname(base_path)  # Go up one level from src
         return os.path.join(base_path, "config.json")
 
+    def config_path(self):
+        """config.json, or config-<device>.json next to it for a named device"""
+        path = self.get_local_path()
+        if self.device is None:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}-{self.device}{ext}"
+
     def _save_local_config(self, data):
-        """Saves the current config to config.json"""
+        """
+        Saves the config to config.json.
+        Written to a temp file in the same folder and renamed over the old
+        one, so a crash mid-write never leaves a truncated config behind.
+        """
+        path = self.config_path()
+        tmp_path = None
         try:
-            path = self.get_local_path()
-            with open(path, "w") as f:
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=".config-", suffix=".tmp", dir=os.path.dirname(path)
+            )
+            with os.fdopen(fd, "w") as f:
                 json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600, keep the permissions config.json had
+            os.chmod(tmp_path, _file_mode(path))
+            os.replace(tmp_path, path)
             print(f"[Config] Saved settings to {path}")
         except Exception as e:
             print(f"[Config] Could not save config: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
     def load_local_config(self):
         """Loads settings from local file, creates default if missing"""
-        path = self.get_local_path()
+        path = self.config_path()
 
         if not os.path.exists(path):
             print(f"[Config] File not found at {path}, creating defaults.")
@@ -64,23 +306,25 @@ class ConfigManager:
             with open(path, "r") as f:
                 local_data = json.load(f)
 
-                for section in ["network", "hardware", "client"]:
-                    if section in local_data:
-                        self.config.setdefault(section, {}).update(local_data[section])
-
-                print(f"[Config] Loaded local settings from {path}")
+            changed = self._apply(local_data, ["network", "hardware", "client"])
+            print(f"[Config] Loaded local settings from {path}")
+            if changed:
+                self.publish(changed)
         except Exception as e:
             print(f"[Config] Error loading local file: {e}")
             print("[Config] Using defaults.")
 
-    def sync_with_esp(self):
-        """Fetches config settings from ESP32 and updates local config"""
-        hostname = self.get_nested("network", "hostname") or "ambilight.local"
-
-        if not hostname.endswith(".local") and "." not in hostname:
-            address = f"{hostname}.local"
-        else:
-            address = hostname
+    def sync_with_esp(self, address=None):
+        """
+        Fetches config settings from ESP32 and updates local config.
+        'address' is the device's HTTP host[:port], defaults to the hostname.
+        """
+        if address is None:
+            hostname = self.get_nested("network", "hostname") or "ambilight.local"
+            if not hostname.endswith(".local") and "." not in hostname:
+                address = f"{hostname}.local"
+            else:
+                address = hostname
 
         url = f"http://{address}/config"
         print(f"[Config] Connecting to ESP at {url}...")
@@ -91,24 +335,26 @@ class ConfigManager:
                 remote_data = response.json()
                 print(f"[DEBUG] Received from ESP: {remote_data}")
 
-                if "hardware" in remote_data:
-                    self.config["hardware"].update(remote_data["hardware"])
-
-                if "client" in remote_data:
-                    self.config["client"].update(remote_data["client"])
-
-                if "network" in remote_data:
-                    if "hostname" in remote_data["network"]:
-                        self.config["network"]["hostname"] = remote_data["network"][
-                            "hostname"
-                        ]
-                    if "wifi_ssid" in remote_data["network"]:
-                        self.config["network"]["wifi_ssid"] = remote_data["network"][
-                            "wifi_ssid"
-                        ]
+                # Only hostname and SSID are taken from the network section
+                network = remote_data.get("network")
+                if isinstance(network, dict):
+                    remote_data["network"] = {
+                        key: network[key]
+                        for key in ("hostname", "wifi_ssid")
+                        if key in network
+                    }
 
-                self._save_local_config(self.config)
-                print("[Config] Successfully synced with ESP32 and saved!")
+                try:
+                    changed = self._apply(
+                        remote_data, ["hardware", "client", "network"]
+                    )
+                except ValueError as e:
+                    print(f"[Config] Ignoring settings from ESP: {e}")
+                    return
+                if changed:
+                    self.publish(changed)
+                    self.mark_dirty(changed)
+                print(f"[Config] Synced with ESP32 ({len(changed)} settings changed)")
             else:
                 print(f"[Config] ESP returned status {response.status_code}")
         except requests.exceptions.RequestException as e:
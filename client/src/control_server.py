@@ -0,0 +1,290 @@
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import tempfile
+import threading
+
+from src.models import AppMode
+
+# Windows (and anything without Unix sockets) falls back to loopback TCP
+DEFAULT_TCP_PORT = 8765
+
+# What 'set' may change. File paths (record_path, trace_path) and the
+# network section stay out: a command must not pick files to overwrite.
+SETTABLE_KEYS = {
+    "client": {
+        "monitor_index",
+        "gamma",
+        "depth",
+        "layout",
+        "smoothing",
+        "scene_cut_threshold",
+        "dithering",
+        "auto_suspend",
+        "connection_type",
+        "com_port",
+        "serial_high_speed",
+        "serial_lossy",
+        "serial_flow_control",
+        "serial_flow_window",
+    },
+    "hardware": {
+        "num_leds",
+        "brightness",
+        "max_milliamps",
+        "smoothing_speed",
+        "baud_rate",
+    },
+}
+
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def default_address():
+    """Unix socket path where available, else ("127.0.0.1", port)"""
+    if hasattr(socketserver, "UnixStreamServer"):
+        return os.path.join(tempfile.gettempdir(), "ambilight.sock")
+    return ("127.0.0.1", DEFAULT_TCP_PORT)
+
+
+def token_path(port):
+    """Where a TCP server leaves its per-run token for local clients"""
+    return os.path.join(tempfile.gettempdir(), f"ambilight-{port}.token")
+
+
+class ControlServer:
+    """
+    Local JSON control API for one or more AmbilightApp instances.
+
+    Protocol: one JSON value per line. A single command object gets a
+    single reply object; a list of commands (batch) gets a list of replies,
+    executed in order on the already running pipelines.
+
+        {"cmd": "set_mode", "mode": "static", "color": [0, 0, 255]}
+        {"cmd": "set", "section": "client", "key": "gamma", "value": 2.4}
+        [{"cmd": "reload_config", "device": "desk"}, {"cmd": "stats"}]
+
+    Commands run on the connection thread and only touch state the worker
+    reads lock-free (mode, config snapshot, counters).
+
+    Any non-JSON line closes the connection. Loopback TCP is reachable by
+    every local process (and web pages), so a TCP server also requires a
+    per-run "token" in every command; it is written to token_path(port),
+    readable by the current user only. Unix sockets rely on file permissions.
+    """
+
+    def __init__(self, apps, address=None):
+        if not isinstance(apps, dict):
+            apps = {"default": apps}
+        self.apps = apps
+        self.default_device = next(iter(apps))
+        self.address = address if address is not None else default_address()
+        self.token = None
+        self._server = None
+        self._thread = None
+
+        self.handlers = {
+            "ping": self._cmd_ping,
+            "devices": self._cmd_devices,
+            "set_mode": self._cmd_set_mode,
+            "get_mode": self._cmd_get_mode,
+            "set": self._cmd_set,
+            "reload_config": self._cmd_reload_config,
+            "stats": self._cmd_stats,
+            "stop": self._cmd_stop,
+        }
+
+    # ==========================================
+    #           Lifecycle
+    # ==========================================
+
+    def start(self):
+        handler = _make_handler(self)
+
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # Stale socket from a previous run
+            self._server = _UnixServer(self.address, handler)
+            os.chmod(self.address, 0o600)
+        else:
+            self._server = _TcpServer(self.address, handler)
+            self.address = self._server.server_address
+            self.token = secrets.token_hex(16)
+            _write_token(token_path(self.address[1]), self.token)
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.2}
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        print(f"[Control] Listening on {self.address}")
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str):
+            path = self.address
+        else:
+            path = token_path(self.address[1])
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = None
+        print("[Control] Stopped.")
+
+    # ==========================================
+    #           Dispatch
+    # ==========================================
+
+    def handle_request(self, request):
+        """A command dict, or a list of them (batch)"""
+        if isinstance(request, list):
+            return [self._execute(command) for command in request]
+        return self._execute(request)
+
+    def _execute(self, command):
+        if not isinstance(command, dict):
+            return {"ok": False, "error": "Command must be a JSON object"}
+
+        if self.token is not None and not hmac.compare_digest(
+            str(command.get("token", "")), self.token
+        ):
+            return {"ok": False, "error": "Bad token"}
+
+        handler = self.handlers.get(command.get("cmd"))
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {command.get('cmd')}"}
+
+        device = command.get("device", self.default_device)
+        app = self.apps.get(device)
+        if app is None:
+            return {"ok": False, "error": f"Unknown device: {device}"}
+
+        try:
+            result = handler(app, command)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": str(e)}
+
+        reply = {"ok": True}
+        if result is not None:
+            reply["result"] = result
+        return reply
+
+    # ==========================================
+    #           Commands
+    # ==========================================
+
+    def _cmd_ping(self, app, command):
+        return "pong"
+
+    def _cmd_devices(self, app, command):
+        return list(self.apps)
+
+    def _cmd_set_mode(self, app, command):
+        mode = AppMode[str(command["mode"]).upper()]
+        if mode == AppMode.EXIT:
+            raise ValueError("Use 'stop' to exit")
+        kwargs = {}
+        if "color" in command:
+            kwargs["color"] = list(command["color"])
+        app.set_mode(mode, **kwargs)
+        return mode.name.lower()
+
+    def _cmd_get_mode(self, app, command):
+        return app.current_mode.name.lower()
+
+    def _cmd_set(self, app, command):
+        section, key = command["section"], command["key"]
+        if key not in SETTABLE_KEYS.get(section, ()):
+            raise ValueError(f"Setting {section}.{key} can't be changed remotely")
+        app.config_mgr.set_nested(section, key, command["value"])
+        return app.config_mgr.snapshot.generation
+
+    def _cmd_reload_config(self, app, command):
+        app.reload_config()
+        return app.config_mgr.snapshot.generation
+
+    def _cmd_stats(self, app, command):
+        return app.get_stats()
+
+    def _cmd_stop(self, app, command):
+        app.stop()
+
+
+def _make_handler(server):
+    class ControlHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    # Not our protocol (e.g. an HTTP request), hang up
+                    self._reply({"ok": False, "error": f"Bad JSON: {e}"})
+                    return
+                self._reply(server.handle_request(request))
+
+        def _reply(self, reply):
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    return ControlHandler
+
+
+def _write_token(path, token):
+    if os.path.exists(path):
+        os.unlink(path)  # Don't inherit someone else's file or permissions
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+
+
+def _with_token(command, token):
+    return dict(command, token=token) if isinstance(command, dict) else command
+
+
+def send_commands(request, address=None, timeout=5.0, token=None):
+    """
+    Client helper: sends a command (or batch) and returns the reply.
+    Over TCP the token is read from token_path() unless given.
+    """
+    if address is None:
+        address = default_address()
+
+    if not isinstance(address, str) and token is None:
+        with open(token_path(address[1])) as f:
+            token = f.read().strip()
+
+    if token is not None:
+        if isinstance(request, list):
+            request = [_with_token(command, token) for command in request]
+        else:
+            request = _with_token(request, token)
+
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+    with sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
@@ -0,0 +1,658 @@
+"""
+Loopback stand-in for the ESP32 firmware.
+
+Speaks the same protocols as the real device so the client can be tested
+and benchmarked on a plain Linux box:
+  * Serial: Adalight frames and 'Cmd{json}\\n' commands over a pty,
+            optionally acknowledged with 'Fc<n>' credit lines
+  * UDP:    raw color buffers and commands on a loopback port
+  * HTTP:   the GET /config endpoint used by ConfigManager.sync_with_esp
+
+Run standalone with: python -m src.device_emulator --leds 60
+"""
+
+import argparse
+import copy
+import json
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.transmitters import encodings
+
+UDP_BUFFER_SIZE = 1460  # Same as firmware UdpManager
+CMD_BUFFER_SIZE = 512  # Same as firmware PacketParser
+
+# High speed mode advertised in reply to Cmd{"cmd": "caps"}
+SUPPORTED_BAUD_RATES = [115200, 230400, 460800, 921600, 2000000]
+SUPPORTED_ENCODINGS = [
+    encodings.ENC_RGB888,
+    encodings.ENC_RGB565,
+    encodings.ENC_RLE,
+    encodings.ENC_DELTA,
+]
+
+# Largest flow control window the device grants (frames in flight)
+FLOW_MAX_WINDOW = 4
+
+# WS2812B timing: 24 bits * 1.25us per LED, plus the latch/reset gap
+LED_WRITE_US_PER_LED = 30
+LED_LATCH_US = 50
+
+
+# ==========================================
+#           Packet Parser (Firmware Port)
+# ==========================================
+
+
+class PacketParser:
+    """
+    Python port of firmware/lib/PacketParser.
+    Same state machine, same quirks (the data length comes from the
+    device LED count, not from the header).
+    """
+
+    ST_IDLE = 0
+    ST_ADA_WAIT_d = 1
+    ST_ADA_WAIT_a = 2
+    ST_ADA_WAIT_HI = 3
+    ST_ADA_WAIT_LO = 4
+    ST_ADA_WAIT_CHK = 5
+    ST_ADA_READ_DATA = 6
+    ST_CMD_WAIT_m = 7
+    ST_CMD_WAIT_d = 8
+    ST_CMD_READ_JSON = 9
+
+    # Extended 'Adz' packets (high speed mode, not in the C++ firmware yet)
+    ST_ADZ_ENC = 10
+    ST_ADZ_LEN_HI = 11
+    ST_ADZ_LEN_LO = 12
+    ST_ADZ_CHK = 13
+    ST_ADZ_READ_DATA = 14
+
+    def __init__(self, device):
+        self.device = device
+        self.state = self.ST_IDLE
+        self.temp_hi = 0
+        self.temp_lo = 0
+        self.data = bytearray()
+        self.cmd_buffer = bytearray()
+        self.frame_start = 0.0
+        self.adz_encoding = 0
+        self.adz_length = 0
+
+        # Extra commands (beyond 'mode' and 'config') can be plugged in here
+        self.command_handlers = {
+            "mode": self._handle_mode_change,
+            "config": self._handle_config_update,
+            "caps": self._handle_caps,
+            "baud": self._handle_baud,
+            "ping": self._handle_ping,
+            "flow": self._handle_flow,
+        }
+
+    def parse(self, chunk, arrival=None):
+        """Feeds a chunk of bytes received at 'arrival' (perf_counter)"""
+        if arrival is None:
+            arrival = time.perf_counter()
+
+        pos = 0
+        size = len(chunk)
+        while pos < size:
+            # Bulk paths for the two payload states
+            if self.state == self.ST_ADA_READ_DATA:
+                needed = self.device.num_leds * 3 - len(self.data)
+                take = chunk[pos : pos + needed]
+                self.data += take
+                pos += len(take)
+                if len(self.data) >= self.device.num_leds * 3:
+                    self.state = self.ST_IDLE
+                    self.device.push_frame(bytes(self.data), self.frame_start)
+                continue
+
+            if self.state == self.ST_ADZ_READ_DATA:
+                take = chunk[pos : pos + self.adz_length - len(self.data)]
+                self.data += take
+                pos += len(take)
+                if len(self.data) >= self.adz_length:
+                    self.state = self.ST_IDLE
+                    self._finish_adz_packet()
+                continue
+
+            if self.state == self.ST_CMD_READ_JSON:
+                end = chunk.find(b"\n", pos)
+                stop = size if end == -1 else end
+                room = CMD_BUFFER_SIZE - 1 - len(self.cmd_buffer)
+                self.cmd_buffer += chunk[pos : pos + max(min(stop - pos, room), 0)]
+                if end == -1:
+                    pos = size
+                else:
+                    pos = end + 1
+                    self.state = self.ST_IDLE
+                    self._execute_json_command(bytes(self.cmd_buffer))
+                continue
+
+            self._parse_byte(chunk[pos], arrival)
+            pos += 1
+
+    def _parse_byte(self, c, arrival):
+        state = self.state
+
+        if state == self.ST_IDLE:
+            if c == ord("A"):
+                self.state = self.ST_ADA_WAIT_d
+                self.frame_start = arrival
+            elif c == ord("C"):
+                self.state = self.ST_CMD_WAIT_m
+
+        # --- Adalight Header ---
+        elif state == self.ST_ADA_WAIT_d:
+            self.state = self.ST_ADA_WAIT_a if c == ord("d") else self.ST_IDLE
+        elif state == self.ST_ADA_WAIT_a:
+            if c == ord("a"):
+                self.state = self.ST_ADA_WAIT_HI
+            elif c == ord("z"):
+                self.state = self.ST_ADZ_ENC
+            else:
+                self.state = self.ST_IDLE
+        elif state == self.ST_ADA_WAIT_HI:
+            self.temp_hi = c
+            self.state = self.ST_ADA_WAIT_LO
+        elif state == self.ST_ADA_WAIT_LO:
+            self.temp_lo = c
+            self.state = self.ST_ADA_WAIT_CHK
+        elif state == self.ST_ADA_WAIT_CHK:
+            if (self.temp_hi ^ self.temp_lo ^ 0x55) == c:
+                header_leds = ((self.temp_hi << 8) | self.temp_lo) + 1
+                if header_leds != self.device.num_leds:
+                    self.device.stats.size_mismatch += 1
+                self.data = bytearray()
+                self.state = self.ST_ADA_READ_DATA
+            else:
+                self.device.stats.corrupt_packets += 1
+                self.device.credit(1)  # Dropped, but the host must not stall
+                self.state = self.ST_IDLE
+
+        # --- Extended Header ---
+        elif state == self.ST_ADZ_ENC:
+            self.adz_encoding = c
+            self.state = self.ST_ADZ_LEN_HI
+        elif state == self.ST_ADZ_LEN_HI:
+            self.temp_hi = c
+            self.state = self.ST_ADZ_LEN_LO
+        elif state == self.ST_ADZ_LEN_LO:
+            self.temp_lo = c
+            self.state = self.ST_ADZ_CHK
+        elif state == self.ST_ADZ_CHK:
+            if (self.adz_encoding ^ self.temp_hi ^ self.temp_lo ^ 0x55) == c:
+                self.adz_length = (self.temp_hi << 8) | self.temp_lo
+                self.data = bytearray()
+                self.state = self.ST_ADZ_READ_DATA
+                if self.adz_length == 0:
+                    self.state = self.ST_IDLE
+                    self._finish_adz_packet()
+            else:
+                self.device.stats.corrupt_packets += 1
+                self.device.credit(1)  # Dropped, but the host must not stall
+                self.state = self.ST_IDLE
+
+        # --- Command Header ---
+        elif state == self.ST_CMD_WAIT_m:
+            self.state = self.ST_CMD_WAIT_d if c == ord("m") else self.ST_IDLE
+        elif state == self.ST_CMD_WAIT_d:
+            if c == ord("d"):
+                self.cmd_buffer = bytearray()
+                self.state = self.ST_CMD_READ_JSON
+            else:
+                self.state = self.ST_IDLE
+        else:
+            self.state = self.ST_IDLE
+
+    def _execute_json_command(self, raw):
+        try:
+            doc = json.loads(raw.decode("utf-8"))
+            command = doc["cmd"]
+        except (ValueError, KeyError, TypeError):
+            self.device.stats.bad_commands += 1
+            self.device.reply_line("JSON Parse failed")
+            return
+
+        self.device.stats.commands += 1
+        handler = self.command_handlers.get(command)
+        if handler is None:
+            self.device.reply_line("Unknown command")
+            return
+        handler(doc)
+
+    def _handle_mode_change(self, doc):
+        mode = doc.get("value")
+        if mode in ("ambilight", "rainbow", "static", "off"):
+            self.device.mode = mode
+            if mode == "static" and "color" in doc:
+                self.device.static_color = list(doc["color"])
+        self.device.reply_line(f"Mode changed to: {mode}")
+
+    def _handle_config_update(self, doc):
+        if doc.get("num_leds"):
+            self.device.set_num_leds(int(doc["num_leds"]))
+        if doc.get("color_order"):
+            self.device.config["hardware"]["color_order"] = doc["color_order"]
+
+    def _handle_caps(self, doc):
+        caps = {"baud": SUPPORTED_BAUD_RATES, "enc": SUPPORTED_ENCODINGS}
+        self.device.reply_line("Caps" + json.dumps(caps))
+
+    def _handle_baud(self, doc):
+        # A pty has no real line speed, acknowledging is all there is to do
+        baud = doc.get("value")
+        if baud in SUPPORTED_BAUD_RATES:
+            self.device.baud_rate = baud
+            self.device.reply_line("Ack" + json.dumps({"cmd": "baud", "value": baud}))
+
+    def _handle_ping(self, doc):
+        self.device.reply_line("Pong{}")
+
+    def _handle_flow(self, doc):
+        # From now on every consumed frame is acknowledged ('Fc<n>' lines)
+        window = min(max(int(doc.get("window", 1)), 1), FLOW_MAX_WINDOW)
+        self.device.enable_flow_control(window)
+        self.device.reply_line("Ack" + json.dumps({"cmd": "flow", "window": window}))
+
+    def _finish_adz_packet(self):
+        try:
+            frame = encodings.decode_payload(
+                self.adz_encoding, bytes(self.data), self.device.target
+            )
+        except (ValueError, struct.error):
+            self.device.stats.corrupt_packets += 1
+            self.device.credit(1)  # Dropped, but the host must not stall
+            return
+
+        if len(frame) != self.device.num_leds * 3:
+            self.device.stats.size_mismatch += 1
+            frame = (frame + self.device.target)[: self.device.num_leds * 3]
+        self.device.push_frame(frame, self.frame_start)
+
+    def push_color_buffer(self, buffer, arrival):
+        """UDP path: copy straight into the target buffer (truncated)"""
+        max_bytes = self.device.num_leds * 3
+        data = bytes(buffer[:max_bytes])
+        if len(data) < max_bytes:
+            self.device.stats.size_mismatch += 1
+            data += self.device.target[len(data) :]
+        self.device.push_frame(data, arrival)
+
+
+# ==========================================
+#           Statistics
+# ==========================================
+
+
+class EmulatorStats:
+    def __init__(self):
+        self.frames_received = 0
+        self.frames_shown = 0
+        self.frames_dropped = 0  # Overwritten before the LEDs showed them
+        self.corrupt_packets = 0  # Bad Adalight checksum
+        self.size_mismatch = 0  # Header / payload LED count differs
+        self.commands = 0
+        self.bad_commands = 0
+        self.latencies = deque(maxlen=1000)  # First byte -> LEDs latched (s)
+        self.receive_times = deque(maxlen=1000)
+
+    def received_fps(self, window=1.0):
+        now = time.perf_counter()
+        return sum(1 for t in self.receive_times if now - t <= window) / window
+
+    def report(self):
+        """Plain dict summary, latencies in milliseconds"""
+        lat = sorted(self.latencies)
+        if lat:
+            avg_ms = sum(lat) / len(lat) * 1000
+            p95_ms = lat[min(int(len(lat) * 0.95), len(lat) - 1)] * 1000
+        else:
+            avg_ms = p95_ms = 0.0
+        return {
+            "fps": round(self.received_fps(), 1),
+            "frames_received": self.frames_received,
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+            "corrupt_packets": self.corrupt_packets,
+            "size_mismatch": self.size_mismatch,
+            "commands": self.commands,
+            "bad_commands": self.bad_commands,
+            "latency_avg_ms": round(avg_ms, 3),
+            "latency_p95_ms": round(p95_ms, 3),
+        }
+
+
+# ==========================================
+#           Device Emulator
+# ==========================================
+
+
+class DeviceEmulator:
+    """
+    Emulates one Ambilight ESP32.
+    Transports run on their own threads; a LED thread plays the role of
+    the firmware loop() and 'shows' frames with realistic write latency.
+    """
+
+    def __init__(
+        self,
+        num_leds=60,
+        udp_port=0,
+        http_port=0,
+        max_fps=None,
+        simulate_latency=True,
+        enable_serial=True,
+    ):
+        self.config = {
+            "network": {
+                "hostname": "127.0.0.1",
+                "wifi_ssid": "emulator",
+                "udp_port": udp_port,
+            },
+            "hardware": {
+                "baud_rate": 115200,
+                "num_leds": num_leds,
+                "brightness": 50,
+                "max_milliamps": 1500,
+                "smoothing_speed": 20,
+                "color_order": "GRB",
+            },
+            "client": {},
+        }
+        self.num_leds = num_leds
+        self.max_fps = max_fps
+        self.simulate_latency = simulate_latency
+        self.enable_serial = enable_serial
+
+        self.mode = "static"
+        self.baud_rate = 115200
+        self.static_color = [255, 0, 0]
+        self.target = bytes(num_leds * 3)  # Latest received frame
+        self.leds = bytes(num_leds * 3)  # What the strip is showing
+
+        self.stats = EmulatorStats()
+        self.parser = PacketParser(self)
+
+        self._lock = threading.RLock()
+        self._frame_ready = threading.Condition(self._lock)
+        self._frame_seq = 0
+        self._frame_arrival = 0.0
+        self._shown_seq = 0
+        self.last_shown_time = 0.0
+
+        # Flow control: frames consumed (shown or overwritten) are credited
+        self.flow_window = 0  # 0 = off
+        self._credited_seq = 0
+
+        self._running = False
+        self._threads = []
+
+        self._master_fd = None
+        self._slave_fd = None
+        self.serial_port = None
+
+        self._udp_sock = None
+        self.udp_port = udp_port
+        self._http = None
+        self.http_port = http_port
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self._running = True
+
+        if self.enable_serial:
+            self._open_pty()
+            self._spawn(self._serial_loop)
+
+        self._udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp_sock.bind(("127.0.0.1", self.udp_port))
+        self._udp_sock.settimeout(0.2)
+        self.udp_port = self._udp_sock.getsockname()[1]
+        self.config["network"]["udp_port"] = self.udp_port
+        self._spawn(self._udp_loop)
+
+        self._http = ThreadingHTTPServer(
+            ("127.0.0.1", self.http_port), _make_handler(self)
+        )
+        self.http_port = self._http.server_address[1]
+        # A plain host like the firmware's: the UDP transmitter uses it as is,
+        # sync_with_esp reaches the HTTP port through an explicit address
+        self.config["network"]["hostname"] = "127.0.0.1"
+        self._spawn(lambda: self._http.serve_forever(poll_interval=0.1))
+
+        self._spawn(self._led_loop)
+
+        print(
+            f"[Emulator] Running: serial={self.serial_port} "
+            f"udp=127.0.0.1:{self.udp_port} http=127.0.0.1:{self.http_port}"
+        )
+        return self
+
+    @property
+    def http_address(self):
+        """Address for ConfigManager.sync_with_esp(address=...)"""
+        return f"127.0.0.1:{self.http_port}"
+
+    def stop(self):
+        self._running = False
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        if self._http:
+            self._http.shutdown()
+            self._http.server_close()
+        for t in self._threads:
+            t.join(timeout=1)
+        if self._udp_sock:
+            self._udp_sock.close()
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self._master_fd = self._slave_fd = None
+        print("[Emulator] Stopped.")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _spawn(self, target):
+        t = threading.Thread(target=target, daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    # --- Serial (pty) ---
+
+    def _open_pty(self):
+        if not hasattr(os, "openpty"):
+            raise RuntimeError("Serial emulation needs a pty (Linux/macOS only)")
+        import tty
+
+        self._master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._slave_fd)
+        tty.setraw(self._master_fd)
+        self.serial_port = os.ttyname(self._slave_fd)
+
+    def _serial_loop(self):
+        while self._running:
+            try:
+                ready, _, _ = select.select([self._master_fd], [], [], 0.2)
+                if not ready:
+                    continue
+                chunk = os.read(self._master_fd, 4096)
+            except (OSError, TypeError, ValueError):
+                break
+            if chunk:
+                self.feed(chunk)
+
+    def reply_line(self, text):
+        """Firmware Serial.println() back to the host"""
+        if self._master_fd is None:
+            return
+        try:
+            os.write(self._master_fd, text.encode("utf-8") + b"\r\n")
+        except OSError:
+            pass
+
+    # --- UDP ---
+
+    def _udp_loop(self):
+        while self._running:
+            try:
+                packet, _ = self._udp_sock.recvfrom(65535)
+            except TimeoutError:
+                continue
+            except OSError:
+                break
+
+            arrival = time.perf_counter()
+            packet = packet[:UDP_BUFFER_SIZE]
+            is_command = packet[:1] == b"{" or (
+                len(packet) > 3 and packet[:3] == b"Cmd"
+            )
+            with self._lock:
+                if is_command:
+                    self.parser.parse(packet, arrival)
+                else:
+                    self.parser.push_color_buffer(packet, arrival)
+
+    # --- Shared Input ---
+
+    def feed(self, chunk):
+        """Feeds raw serial bytes into the parser (also usable directly)"""
+        with self._lock:
+            self.parser.parse(chunk, time.perf_counter())
+
+    def push_frame(self, data, arrival):
+        """Called by the parser when a complete frame landed in the buffer"""
+        with self._frame_ready:
+            self.target = data
+            self._frame_seq += 1
+            self._frame_arrival = arrival
+            self.stats.frames_received += 1
+            self.stats.receive_times.append(time.perf_counter())
+            self._frame_ready.notify_all()
+
+    def enable_flow_control(self, window):
+        with self._lock:
+            self.flow_window = window
+            self._credited_seq = self._frame_seq
+
+    def credit(self, count):
+        if self.flow_window and count > 0:
+            self.reply_line(f"Fc{count}")
+
+    def set_num_leds(self, count):
+        with self._lock:
+            self.num_leds = count
+            self.config["hardware"]["num_leds"] = count
+            self.target = bytes(count * 3)
+            self.leds = bytes(count * 3)
+
+    # --- LED Output (firmware loop) ---
+
+    def _led_loop(self):
+        min_interval = 1.0 / self.max_fps if self.max_fps else 0.0
+        last_show = 0.0
+
+        while self._running:
+            with self._frame_ready:
+                while self._running and self._frame_seq == self._shown_seq:
+                    self._frame_ready.wait(0.2)
+                if not self._running:
+                    break
+                frame = self.target
+                arrival = self._frame_arrival
+                seq = self._frame_seq
+                self.stats.frames_dropped += seq - self._shown_seq - 1
+                self._shown_seq = seq
+                num_leds = self.num_leds
+
+            if self.simulate_latency:
+                wait = last_show + min_interval - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                time.sleep((num_leds * LED_WRITE_US_PER_LED + LED_LATCH_US) / 1e6)
+
+            with self._frame_ready:
+                self.leds = frame
+                last_show = self.last_shown_time = time.perf_counter()
+                self.stats.frames_shown += 1
+                self.stats.latencies.append(last_show - arrival)
+                self._frame_ready.notify_all()
+
+                # Acknowledge this frame and any it overwrote
+                consumed = seq - self._credited_seq
+                self._credited_seq = seq
+            self.credit(consumed)
+
+    def wait_for_frame(self, timeout=1.0):
+        """Blocks until the next frame is shown on the emulated strip.
+        Returns the shown bytes, or None on timeout."""
+        with self._frame_ready:
+            start = self.stats.frames_shown
+            deadline = time.perf_counter() + timeout
+            while self.stats.frames_shown == start:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._frame_ready.wait(remaining)
+            return self.leds
+
+
+def _make_handler(device):
+    class ConfigHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/config":
+                self.send_error(404)
+                return
+            body = json.dumps(copy.deepcopy(device.config)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the console for stats
+
+    return ConfigHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ambilight device emulator")
+    parser.add_argument("--leds", type=int, default=60)
+    parser.add_argument("--udp-port", type=int, default=8888)
+    parser.add_argument("--http-port", type=int, default=8080)
+    parser.add_argument("--fps", type=float, default=None, help="Cap LED updates")
+    args = parser.parse_args()
+
+    device = DeviceEmulator(
+        num_leds=args.leds,
+        udp_port=args.udp_port,
+        http_port=args.http_port,
+        max_fps=args.fps,
+    ).start()
+
+    try:
+        while True:
+            time.sleep(1)
+            print(f"[Emulator] {device.stats.report()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.stop()
+
+
+if __name__ == "__main__":
+    main()
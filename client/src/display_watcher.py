@@ -0,0 +1,90 @@
+import threading
+
+import mss
+
+# What reading the monitor list can raise (platform APIs, odd mss output)
+READ_ERRORS = (OSError, KeyError, TypeError, ValueError)
+if isinstance(getattr(mss, "ScreenShotError", None), type):
+    READ_ERRORS += (mss.ScreenShotError,)
+
+
+def monitor_rects(sct):
+    """Monitor rects of an mss instance as a hashable tuple (0 = all screens)"""
+    return tuple((m["left"], m["top"], m["width"], m["height"]) for m in sct.monitors)
+
+
+def read_monitors():
+    # A fresh mss instance: mss caches the monitor list per instance
+    with mss.mss() as sct:
+        return monitor_rects(sct)
+
+
+class DisplayWatcher:
+    """
+    Polls the display topology at a low rate on its own thread.
+
+    Calls 'callback(monitors)' when a monitor is added/removed or changes
+    position, resolution or DPI scaling (which changes its pixel size), so
+    the capture path can rebuild its cached geometry instead of checking
+    it every frame. Paused while nothing is captured, resume() polls at once.
+    """
+
+    def __init__(self, callback, interval=2.0):
+        self.callback = callback
+        self.interval = interval
+        self.monitors = None
+        self._stop = threading.Event()
+        self._active = threading.Event()  # Cleared while paused
+        self._thread = None
+        self._last_error = None
+
+    def start(self):
+        self._active.set()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._active.set()  # Let a paused loop see the stop
+
+    def pause(self):
+        self._active.clear()
+
+    def resume(self):
+        if not self._active.is_set():
+            self._active.set()
+
+    def poll(self):
+        """One check, returns True when the topology changed"""
+        monitors = read_monitors()
+        if monitors == self.monitors:
+            return False
+
+        if self.monitors is not None:
+            print(f"[Display] Monitor layout changed: {monitors[1:]}")
+        self.monitors = monitors
+        self.callback(monitors)
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._active.is_set():
+                # Paused: no polling at all. Once resumed, check right away,
+                # the layout may have changed meanwhile.
+                self._active.wait()
+            elif self._stop.wait(self.interval):
+                break
+            if self._stop.is_set() or not self._active.is_set():
+                continue
+            try:
+                self.poll()
+                self._last_error = None
+            except READ_ERRORS as e:
+                # Report once, not every poll
+                if str(e) != self._last_error:
+                    print(f"[Display] Could not read monitors: {e}")
+                    self._last_error = str(e)
@@ -0,0 +1,29 @@
+import numpy as np
+
+
+class TemporalDither:
+    """
+    Quantizes high precision LED values (float, 0-255) to 8-bit.
+    The rounding error of every LED channel is carried into the next
+    frame, so over a few frames the strip averages to the exact value.
+    This hides the stepping that gamma correction causes in dark fades.
+    """
+
+    def __init__(self):
+        self._error = None
+
+    def reset(self):
+        self._error = None
+
+    def quantize(self, values):
+        """'values' is a float32 (N, 3) array, returns uint8 (N, 3)"""
+        if self._error is None or self._error.shape != values.shape:
+            self._error = np.zeros(values.shape, dtype=np.float32)
+
+        target = values + self._error
+        out = np.clip(np.rint(target), 0, 255)
+
+        # Clipped values (pure black/white) must not build up error
+        np.subtract(target, out, out=self._error)
+        np.clip(self._error, -0.5, 0.5, out=self._error)
+        return out.astype(np.uint8)
@@ -0,0 +1,20 @@
+class FrameBuffer:
+    """
+    Latest-frame mailbox between the worker and the UI.
+
+    The worker publishes every frame it sends; readers (the LED preview)
+    pick up the newest one whenever they like. Publishing swaps a single
+    tuple reference, so there is no lock and the worker never waits on
+    a reader. Readers use the sequence number to skip frames they drew.
+    """
+
+    def __init__(self):
+        self._latest = (0, b"", (0, 0, 0, 0))  # (seq, frame, layout)
+
+    def publish(self, frame, layout):
+        """Worker side: 'layout' is (left, top, right, bottom) LED counts"""
+        self._latest = (self._latest[0] + 1, frame, layout)
+
+    def latest(self):
+        """Reader side: returns (seq, frame_bytes, layout)"""
+        return self._latest
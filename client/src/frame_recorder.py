@@ -0,0 +1,378 @@
+import argparse
+import bisect
+import mmap
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# ==========================================
+#           On-Disk Format
+# ==========================================
+#
+# [File Header]  MAGIC (8s) | version (H) | reserved (H)
+# [Block]*       compressed_len (I) | frame_count (I) | zlib(frames)
+# [Index]        (block_offset (Q) | first_ts (d) | frame_count (I)) * N
+# [Footer]       index_offset (Q) | block_count (I) | INDEX_MAGIC (8s)
+#
+# Inside a decompressed block every frame is stored as:
+#   timestamp (d) | length (I) | kind (B) | payload
+# The first frame of a block is always a key frame so blocks can be
+# decoded on their own. Following frames are XOR deltas against the
+# previous frame, which turns unchanged LEDs into runs of zeros.
+
+MAGIC = b"AMBREC01"
+INDEX_MAGIC = b"AMBIDX01"
+FORMAT_VERSION = 1
+
+FILE_HEADER = struct.Struct("<8sHH")
+BLOCK_HEADER = struct.Struct("<II")
+FRAME_HEADER = struct.Struct("<dIB")
+INDEX_ENTRY = struct.Struct("<QdI")
+FOOTER = struct.Struct("<QI8s")
+
+KIND_KEY = 0
+KIND_DELTA = 1
+
+
+def _xor_bytes(a, b):
+    """XOR two equally sized byte strings"""
+    return np.bitwise_xor(
+        np.frombuffer(a, dtype=np.uint8), np.frombuffer(b, dtype=np.uint8)
+    ).tobytes()
+
+
+class FrameRecorder:
+    """
+    Appends timestamped LED frames to a compact recording file.
+    Frames are buffered into blocks, delta encoded and zlib compressed.
+    Full blocks are compressed and written by a background thread, so
+    the caller (the worker loop) only ever pays for a memory copy.
+    """
+
+    def __init__(self, path, frames_per_block=120, compression_level=6):
+        self.path = path
+        self.frames_per_block = frames_per_block
+        self.compression_level = compression_level
+
+        # The file is only opened (append) while a block is written,
+        # so no handle stays open for the whole session
+        with open(path, "wb") as f:
+            f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        self._closed = False
+
+        self._lock = threading.Lock()
+        self._index = []  # (offset, first_ts, frame_count)
+        self._block = bytearray()
+        self._block_frames = 0
+        self._block_first_ts = 0.0
+        self._prev_frame = None
+        self._start_time = None
+
+        self.frames_written = 0
+
+        # Finished blocks waiting for the writer thread, None = stop
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_blocks)
+        self._writer.daemon = True
+        self._writer.start()
+        print(f"[Recorder] Recording frames to {path}")
+
+    def write_frame(self, frame, timestamp=None):
+        """
+        Adds one frame. 'timestamp' is a monotonic time in seconds,
+        defaults to now. Stored timestamps are relative to the first frame.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        with self._lock:
+            if self._closed:
+                return
+
+            if self._start_time is None:
+                self._start_time = timestamp
+            ts = timestamp - self._start_time
+
+            frame = bytes(frame)
+            if self._block_frames == 0:
+                self._block_first_ts = ts
+
+            # Key frame at block start or when the LED count changed
+            if (
+                self._block_frames == 0
+                or self._prev_frame is None
+                or len(self._prev_frame) != len(frame)
+            ):
+                kind, payload = KIND_KEY, frame
+            else:
+                kind, payload = KIND_DELTA, _xor_bytes(frame, self._prev_frame)
+
+            self._block += FRAME_HEADER.pack(ts, len(payload), kind)
+            self._block += payload
+            self._block_frames += 1
+            self._prev_frame = frame
+            self.frames_written += 1
+
+            if self._block_frames >= self.frames_per_block:
+                self._flush_block()
+
+    def _flush_block(self):
+        """Hands the pending block to the writer thread"""
+        if self._block_frames == 0 or self._closed:
+            return
+
+        self._queue.put((self._block, self._block_first_ts, self._block_frames))
+        self._block = bytearray()
+        self._block_frames = 0
+
+    def _write_blocks(self):
+        """Writer thread: compresses blocks and appends them to the file"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                block, first_ts, frame_count = item
+                compressed = zlib.compress(bytes(block), self.compression_level)
+                with open(self.path, "ab") as f:
+                    offset = f.tell()
+                    f.write(BLOCK_HEADER.pack(len(compressed), frame_count))
+                    f.write(compressed)
+                self._index.append((offset, first_ts, frame_count))
+            except OSError as e:
+                print(f"[Recorder] Could not write block: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Waits until every finished block is on disk"""
+        self._queue.join()
+
+    def close(self):
+        """Flushes the last block and writes the seek index"""
+        with self._lock:
+            if self._closed:
+                return
+
+            self._flush_block()
+            self._queue.put(None)
+            self._writer.join()
+
+            with open(self.path, "ab") as f:
+                index_offset = f.tell()
+                f.writelines(INDEX_ENTRY.pack(*entry) for entry in self._index)
+                f.write(FOOTER.pack(index_offset, len(self._index), INDEX_MAGIC))
+
+            self._closed = True
+            print(f"[Recorder] Saved {self.frames_written} frames to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FrameReader:
+    """
+    Memory-mapped reader for recording files.
+    Only the blocks that are actually read get decompressed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # The map keeps its own reference, the file can be closed right away
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _ = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an LED recording")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported recording version {version}")
+
+        self.index = self._load_index()
+        self._block_times = [entry[1] for entry in self.index]
+
+    def _load_index(self):
+        size = len(self._map)
+        if size >= FILE_HEADER.size + FOOTER.size:
+            index_offset, count, magic = FOOTER.unpack_from(
+                self._map, size - FOOTER.size
+            )
+            if magic == INDEX_MAGIC:
+                return [
+                    INDEX_ENTRY.unpack_from(
+                        self._map, index_offset + i * INDEX_ENTRY.size
+                    )
+                    for i in range(count)
+                ]
+
+        # No footer (recorder did not close cleanly), rebuild by scanning
+        print(f"[Recorder] Index missing in {self.path}, scanning blocks...")
+        return self._scan_blocks(size)
+
+    def _scan_blocks(self, size):
+        index = []
+        offset = FILE_HEADER.size
+        while offset + BLOCK_HEADER.size <= size:
+            compressed_len, frame_count = BLOCK_HEADER.unpack_from(self._map, offset)
+            data_start = offset + BLOCK_HEADER.size
+            if frame_count == 0 or data_start + compressed_len > size:
+                break
+            try:
+                first = zlib.decompressobj().decompress(
+                    self._map[data_start : data_start + compressed_len],
+                    FRAME_HEADER.size,
+                )
+            except zlib.error:
+                break
+            first_ts = FRAME_HEADER.unpack_from(first, 0)[0]
+            index.append((offset, first_ts, frame_count))
+            offset = data_start + compressed_len
+        return index
+
+    def __len__(self):
+        return sum(entry[2] for entry in self.index)
+
+    @property
+    def duration(self):
+        """Timestamp of the last frame in seconds"""
+        if not self.index:
+            return 0.0
+        return self.read_block(len(self.index) - 1)[-1][0]
+
+    def read_block(self, block_idx):
+        """Decodes one block into a list of (timestamp, frame_bytes)"""
+        offset, _, _ = self.index[block_idx]
+        compressed_len, frame_count = BLOCK_HEADER.unpack_from(self._map, offset)
+        start = offset + BLOCK_HEADER.size
+        raw = zlib.decompress(self._map[start : start + compressed_len])
+
+        frames = []
+        prev = None
+        pos = 0
+        for _ in range(frame_count):
+            ts, length, kind = FRAME_HEADER.unpack_from(raw, pos)
+            pos += FRAME_HEADER.size
+            payload = raw[pos : pos + length]
+            pos += length
+
+            if kind == KIND_DELTA and prev is not None:
+                frame = _xor_bytes(payload, prev)
+            else:
+                frame = payload
+
+            frames.append((ts, frame))
+            prev = frame
+        return frames
+
+    def find_block(self, timestamp):
+        """Index of the block containing 'timestamp'"""
+        return max(bisect.bisect_right(self._block_times, timestamp) - 1, 0)
+
+    def frames(self, start_time=0.0):
+        """Yields (timestamp, frame_bytes) from 'start_time' onwards"""
+        if not self.index:
+            return
+        for block_idx in range(self.find_block(start_time), len(self.index)):
+            for ts, frame in self.read_block(block_idx):
+                if ts >= start_time:
+                    yield ts, frame
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FrameReplayer:
+    """
+    Streams a recording through any DataTransmitter.
+    'speed' scales playback (2.0 = twice as fast, 0 = no pacing at all).
+    """
+
+    def __init__(self, path, transmitter, speed=1.0):
+        self.path = path
+        self.transmitter = transmitter
+        self.speed = speed
+
+    def play(self, start_time=0.0, stop_event=None):
+        """Blocks until the recording ends or 'stop_event' is set.
+        Returns the number of frames sent."""
+        sent = 0
+        with FrameReader(self.path) as reader:
+            print(
+                f"[Replay] Playing {len(reader)} frames from {self.path} "
+                f"(x{self.speed})"
+            )
+            wall_start = time.perf_counter()
+
+            for ts, frame in reader.frames(start_time):
+                if stop_event is not None and stop_event.is_set():
+                    break
+
+                if self.speed > 0:
+                    target = (ts - start_time) / self.speed
+                    delay = target - (time.perf_counter() - wall_start)
+                    if delay > 0:
+                        if stop_event is not None:
+                            if stop_event.wait(delay):
+                                break
+                        else:
+                            time.sleep(delay)
+
+                self.transmitter.send_colors(frame)
+                sent += 1
+
+        print(f"[Replay] Finished, {sent} frames sent.")
+        return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an LED recording")
+    parser.add_argument("--replay", required=True, metavar="FILE")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="2 = twice as fast, 0 = unpaced"
+    )
+    parser.add_argument("--start", type=float, default=0.0, help="Seconds to skip")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--port", help="Serial port of the device (e.g. COM3)")
+    target.add_argument("--udp", metavar="HOST:PORT", help="Device UDP address")
+    parser.add_argument("--baud", type=int, default=115200)
+    args = parser.parse_args()
+
+    # Imported here, the transmitters pull in pyserial/sockets
+    if args.port:
+        from src.transmitters.serial_transmitter import SerialTransmitter
+
+        transmitter = SerialTransmitter(args.port, args.baud)
+    else:
+        from src.transmitters.udp_transmitter import UdpTransmitter
+
+        host, _, port = args.udp.rpartition(":")
+        transmitter = UdpTransmitter(host, int(port))
+
+    stop_event = threading.Event()
+    try:
+        FrameReplayer(args.replay, transmitter, args.speed).play(args.start, stop_event)
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        transmitter.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class FrameTracer:
+    """
+    Per-frame latency tracing, from the capture timestamp to the wire.
+
+    The worker calls begin_frame() right before grabbing the screen, each
+    pipeline stage calls mark(name) when it finishes, and end_frame() closes
+    the frame. Tracing is off when no tracer exists, callers check for None
+    so a disabled tracer costs a single attribute test per stage.
+    """
+
+    def __init__(self, max_frames=20000):
+        self._frames = deque(maxlen=max_frames)  # (capture_ns, [(stage, start, end)])
+        self._lock = threading.Lock()
+        self._stats = {}  # stage -> [count, total_ns, max_ns]
+
+        self._capture_ns = None
+        self._last_ns = 0
+        self._stages = []
+
+    def begin_frame(self):
+        """Stamps the capture time of a new frame (monotonic clock)"""
+        self._capture_ns = self._last_ns = time.perf_counter_ns()
+        self._stages = []
+
+    def mark(self, stage):
+        """Closes the stage that ran since the previous mark"""
+        if self._capture_ns is None:
+            return
+        now = time.perf_counter_ns()
+        self._stages.append((stage, self._last_ns, now))
+        self._last_ns = now
+
+    def end_frame(self):
+        """Stores the frame, total = capture to last mark"""
+        if self._capture_ns is None:
+            return
+
+        capture_ns, stages = self._capture_ns, self._stages
+        self._capture_ns = None
+
+        with self._lock:
+            self._frames.append((capture_ns, stages))
+            for stage, start, end in stages:
+                self._add_stat(stage, end - start)
+            if stages:
+                self._add_stat("total", stages[-1][2] - capture_ns)
+
+    def discard_frame(self):
+        """Drops the current frame (e.g. the grab failed)"""
+        self._capture_ns = None
+
+    def _add_stat(self, stage, duration_ns):
+        entry = self._stats.setdefault(stage, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += duration_ns
+        entry[2] = max(entry[2], duration_ns)
+
+    def stats(self):
+        """{stage: {"count", "avg_ms", "max_ms"}}, 'total' is screen to wire"""
+        with self._lock:
+            return {
+                stage: {
+                    "count": count,
+                    "avg_ms": round(total / count / 1e6, 3),
+                    "max_ms": round(peak / 1e6, 3),
+                }
+                for stage, (count, total, peak) in self._stats.items()
+            }
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the session as Chrome trace JSON
+        (open in chrome://tracing or ui.perfetto.dev).
+        """
+        with self._lock:
+            frames = list(self._frames)
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": 1,
+                "args": {"name": "LED Worker"},
+            }
+        ]
+        for frame_no, (capture_ns, stages) in enumerate(frames):
+            if not stages:
+                continue
+            end_ns = stages[-1][2]
+            events.append(
+                {
+                    "name": "frame",
+                    "cat": "frame",
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": 1,
+                    "ts": capture_ns / 1000,
+                    "dur": (end_ns - capture_ns) / 1000,
+                    "args": {
+                        "frame": frame_no,
+                        "latency_ms": (end_ns - capture_ns) / 1e6,
+                    },
+                }
+            )
+            for stage, start, end in stages:
+                events.append(
+                    {
+                        "name": stage,
+                        "cat": "stage",
+                        "ph": "X",
+                        "pid": pid,
+                        "tid": 1,
+                        "ts": start / 1000,
+                        "dur": (end - start) / 1000,
+                    }
+                )
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"[Trace] Wrote {len(frames)} frames to {path}")
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum, auto
 
 
@@ -7,3 +8,22 @@ class AppMode(Enum):
     RAINBOW = auto()
     STATIC = auto()
     EXIT = auto()
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable view of the settings the per-frame path needs.
+    A new snapshot (with a higher generation) is published on every change,
+    readers grab the current one once per frame without locking.
+    """
+
+    generation: int
+    num_leds: int
+    monitor_index: int
+    gamma: float
+    depth: int
+    layout: tuple  # (left, top, right, bottom)
+    smoothing: float  # 0 = off, closer to 1 = heavier (0 <= smoothing < 1)
+    scene_cut_threshold: float  # Mean color change (0-255) that skips smoothing
+    dithering: bool  # Temporal dithering when quantizing to 8-bit
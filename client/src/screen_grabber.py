@@ -1,102 +1,244 @@
 import mss
 import numpy as np
-from PIL import Image
+
+from src.display_watcher import DisplayWatcher, monitor_rects
+from src.dithering import TemporalDither
+from src.smoothing import TemporalSmoother
 
 
 class ScreenGrabber:
     def __init__(self, config_manager):
         self.cfg = config_manager
         self.sct = None
-        self.gamma_table = None
-
+        self.tracer = None  # Optional FrameTracer, set by the app
+        self.smoother = TemporalSmoother()
+        self.dither = TemporalDither()
+
+        # Caches derived from config snapshots, flagged stale by the
+        # ConfigManager and rebuilt on the capture thread
+        self._smoothing_stale = True
+        self._sampling_stale = True
+        self._missing_monitor = None  # Warn once, not every frame
+
+        # Capture geometry, None = rebuild on the next frame
+        self._monitors = None  # Topology from the DisplayWatcher
+        self._monitor = None  # Capture rect passed to sct.grab
+        self._zones = None  # Per-LED sampling tables, see _build_zones
+        self._geometry_version = 0  # Bumped on invalidation
+        self.watcher = DisplayWatcher(self._on_displays_changed)
+
+        self.cfg.subscribe("smoothing", self._on_smoothing_changed)
+        self.cfg.subscribe("grabber", self._on_sampling_changed)
         self.reload_config()
 
+    def _on_smoothing_changed(self, snapshot):
+        self._smoothing_stale = True
+
+    def _on_sampling_changed(self, snapshot):
+        self._sampling_stale = True
+        self._invalidate_geometry()
+
     def reload_config(self):
-        # Creates a gamma values table to save computing time
-        gamma_val = self.cfg.get_nested("client", "gamma")
-        self.gamma_table = np.array(
-            [int((i / 255.0) ** gamma_val * 255) for i in range(256)]
-        ).astype(np.uint8)  # Each value is assigned with a new gamma one 0-255
-
-        # Saves settings
-        self.monitor_idx = self.cfg.get_nested("client", "monitor_index")
-        self.depth = self.cfg.get_nested("client", "depth")
-        self.leds = self.cfg.get_nested(
-            "client", "layout"
-        )  # dict: left, top, right, bottom
-
-    def _process_side(self, img_array, num_leds, is_vertical, reverse=False):
-        """Helper function to proccess one side.
-        Handles transposing of vertical sides.
-        Handles reversing depending on wiring"""
-        if num_leds == 0:
-            return b""
-        if is_vertical:
-            img_array = img_array.transpose(1, 0, 2)
-
-        img = Image.fromarray(img_array)
-
-        # Using image resize to get color average of an area
-        resized_img = img.resize((num_leds, 1), Image.Resampling.BILINEAR)
-
-        # Back to array and change to gamma values
-        color_data = np.array(resized_img)[0]
-        corrected_color = self.gamma_table[color_data]
-
-        # reversing (left and bottom)
-        if reverse:
-            corrected_color = corrected_color[::-1]
-
-        return corrected_color.flatten().tobytes()
-
-    def get_frame_bytes(self):
-        """"""
+        """Applies the latest published config snapshot"""
+        self._smoothing_stale = True
+        self._sampling_stale = True
+        self._sync_caches()
+
+    def _sync_caches(self):
+        """Rebuilds derived caches, only the ones whose inputs changed"""
+        if self._smoothing_stale:
+            # The flag is raised after the swap, so the current snapshot
+            # is at least as new as the change that raised it
+            self._smoothing_stale = False
+            latest = self.cfg.snapshot
+            self.smoother.configure(latest.smoothing, latest.scene_cut_threshold)
+            if latest.smoothing <= 0:
+                self.smoother.reset()
+            elif self.cfg.get_nested("hardware", "smoothing_speed", 255) < 255:
+                # See TemporalSmoother: the device would fade the cuts anyway
+                print(
+                    "[Screen] Client smoothing is on but the device still blends "
+                    "(hardware smoothing_speed < 255), scene cuts will fade"
+                )
+
+        if self._sampling_stale:
+            self._sampling_stale = False
+            if not self.cfg.snapshot.dithering:
+                self.dither.reset()
+
+    # ==========================================
+    #           Cached Geometry
+    # ==========================================
+
+    def _on_displays_changed(self, monitors):
+        """DisplayWatcher thread: new topology, rebuild on the next frame"""
+        self._monitors = monitors
+        self._invalidate_geometry()
+
+    def _invalidate_geometry(self):
+        self._monitor = None
+        self._zones = None
+        self._geometry_version += 1
+
+    def _resolve_monitor(self, snapshot):
+        """Capture rect of the configured monitor"""
+        monitors = self._monitors
+        if monitors is None:
+            monitors = self._monitors = monitor_rects(self.sct)
+            self.watcher.monitors = monitors  # Baseline for change detection
+
+        monitor_idx = snapshot.monitor_index
+        if not 0 <= monitor_idx < len(monitors):
+            if self._missing_monitor != monitor_idx:
+                print(f"[Screen] Monitor {monitor_idx} not found, using 1")
+                self._missing_monitor = monitor_idx
+            monitor_idx = 1
+        else:
+            self._missing_monitor = None
+
+        left, top, width, height = monitors[monitor_idx]
+        return {"left": left, "top": top, "width": width, "height": height}
+
+    def _build_zones(self, snapshot, height, width):
+        """
+        Precomputes everything per-LED sampling needs for this image size
+        and layout: the edge regions, the bin starts, the 1/area scale and
+        a view into a reused output buffer (reversed for left and bottom).
+        """
+        depth_x = max(1, min(snapshot.depth, width // 2))
+        depth_y = max(1, min(snapshot.depth, height // 2))
+        leds_left, leds_top, leds_right, leds_bottom = snapshot.layout
+
+        sides = (
+            # (leds, region, is_vertical, reverse), in strip order
+            (leds_left, (slice(None), slice(0, depth_x)), True, True),
+            (leds_top, (slice(0, depth_y), slice(None)), False, False),
+            (leds_right, (slice(None), slice(width - depth_x, width)), True, False),
+            (leds_bottom, (slice(height - depth_y, height), slice(None)), False, True),
+        )
+
+        buffer = np.zeros((sum(side[0] for side in sides), 4), dtype=np.float32)
+        zones = []
+        offset = 0
+        for num_leds, region, is_vertical, reverse in sides:
+            if num_leds == 0:
+                continue
+
+            length = height if is_vertical else width
+            depth = depth_x if is_vertical else depth_y
+
+            edges = np.linspace(0, length, num_leds + 1).astype(np.intp)
+            starts = np.minimum(edges[:-1], length - 1)
+            counts = np.maximum(np.diff(edges), 1) * depth
+            scale = (1.0 / counts.astype(np.float32))[:, None]
+
+            out = buffer[offset : offset + num_leds]
+            if reverse:
+                out = out[::-1]
+            offset += num_leds
+
+            zones.append((region, is_vertical, starts, scale, out))
+
+        return buffer, zones
+
+    def _sample(self, img, zones):
+        """
+        Averages the area behind every LED in float32, so the result keeps
+        more precision than the 8-bit capture. Vertical sides are binned
+        along rows first (fast contiguous adds). Returns the (N, 4) BGRA buffer.
+        """
+        buffer, sides = zones
+        for region, is_vertical, starts, scale, out in sides:
+            side = img[region]
+            if is_vertical:
+                sums = np.add.reduceat(side, starts, axis=0, dtype=np.uint32)
+                sums = sums.sum(axis=1)
+            else:
+                sums = side.sum(axis=0, dtype=np.uint32)
+                sums = np.add.reduceat(sums, starts, axis=0)
+            np.multiply(sums, scale, out=out, dtype=np.float32)
+        return buffer
+
+    def pause_watcher(self):
+        """Stops display polling while nothing is captured (idle, suspended)"""
+        self.watcher.pause()
+
+    def resume_watcher(self):
+        self.watcher.resume()
+
+    def close(self):
+        self.watcher.stop()
+
+    # ==========================================
+    #           Hot Path
+    # ==========================================
+
+    def get_frame_bytes(self, snapshot=None):
+        """
+        Grabs the screen and returns the LED colors as bytes (None on error).
+        All settings come from one config snapshot, so a config change
+        can never produce a frame with mixed LED counts.
+        Geometry is cached and only rebuilt after the DisplayWatcher or
+        a config change invalidated it.
+        """
+        tracer = self.tracer
+        if snapshot is None:
+            snapshot = self.cfg.snapshot
+        if self._smoothing_stale or self._sampling_stale:
+            self._sync_caches()
+
         try:
             # Initial sct in the current thread
             if self.sct is None:
                 self.sct = mss.mss()
+                self.watcher.start()
 
-            # Monitor availibiliy
-            if self.monitor_idx >= len(self.sct.monitors):
-                print(f"[Screen] Monitor {self.monitor_idx} not found, using 1")
-                self.monitor_idx = 1
-
-            monitor = self.sct.monitors[self.monitor_idx]
+            # Rebuilt geometry is only cached if nothing invalidated it
+            # meanwhile (watcher thread, or a newer config snapshot)
+            version = self._geometry_version
+            monitor = self._monitor
+            if monitor is None:
+                monitor = self._resolve_monitor(snapshot)
+                if version == self._geometry_version:
+                    self._monitor = monitor
 
             # Screen grabbing
             sct_img = self.sct.grab(monitor)
-
-            # Image to array, BRG to RGB
-            img = np.array(sct_img)[:, :, :3]
-            img = img[:, :, ::-1]
-
-            h, w, _ = img.shape
-
-            # Calculate safe depth (smaller than screen size)
-            safe_depth_x = min(self.depth, w // 2)
-            safe_depth_y = min(self.depth, h // 2)
-
-            # Slicing sides
-            img_left = img[:, :safe_depth_x]
-            img_top = img[:safe_depth_y, :]
-            img_right = img[:, -safe_depth_x:]
-            img_bottom = img[-safe_depth_y:, :]
-
-            # Proccessing
-            bytes_left = self._process_side(
-                img_left, self.leds["left"], is_vertical=True, reverse=True
-            )
-            bytes_top = self._process_side(
-                img_top, self.leds["top"], is_vertical=False, reverse=False
-            )
-            bytes_right = self._process_side(
-                img_right, self.leds["right"], is_vertical=True, reverse=False
-            )
-            bytes_bottom = self._process_side(
-                img_bottom, self.leds["bottom"], is_vertical=False, reverse=True
-            )
-
-            return bytes_left + bytes_top + bytes_right + bytes_bottom
+            if tracer is not None:
+                tracer.mark("grab")
+
+            # BGRA buffer used in place (no copy), converted to RGB per LED later
+            img = np.asarray(sct_img)
+
+            zones = self._zones
+            if zones is None:
+                zones = self._build_zones(snapshot, img.shape[0], img.shape[1])
+                if version == self._geometry_version and snapshot is self.cfg.snapshot:
+                    self._zones = zones
+
+            colors = self._sample(img, zones)[:, 2::-1]  # BGRA -> RGB
+
+            # Gamma in float, no 8-bit rounding yet
+            colors = np.power(colors * (1 / 255.0), snapshot.gamma) * 255.0
+            if tracer is not None:
+                tracer.mark("sample")
+
+            # Temporal smoothing, bypassed on scene cuts
+            if snapshot.smoothing > 0:
+                colors = self.smoother.process(colors)
+                if tracer is not None:
+                    tracer.mark("smooth")
+
+            # Back to 8-bit for the strip
+            if snapshot.dithering:
+                colors = self.dither.quantize(colors)
+            else:
+                colors = np.clip(np.rint(colors), 0, 255).astype(np.uint8)
+
+            frame = colors.tobytes()
+            if tracer is not None:
+                tracer.mark("quantize")
+            return frame
 
         except Exception as e:
             print(f"[Screen] Error grabbing frame: {e}")
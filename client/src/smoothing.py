@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class TemporalSmoother:
+    """
+    Exponential smoothing of the sampled LED colors with scene-cut bypass.
+
+    'strength' is how much of the previous output is kept per frame
+    (0 = off, 0.9 = very heavy). Before blending, the mean absolute color
+    change between this and the previous sampled frame is measured; at or
+    above 'cut_threshold' (0-255) the frame is treated as a hard cut and
+    shown as-is, so heavy smoothing doesn't lag behind scene changes.
+
+    The firmware blends every frame once more (nblend with the hardware
+    'smoothing_speed', 20 by default), which still fades a cut over many
+    device ticks. Client smoothing is meant to replace it: set the device's
+    smoothing_speed to 255 (no blending) for the bypass to be instant.
+    """
+
+    def __init__(self, strength=0.0, cut_threshold=40.0):
+        self.strength = strength
+        self.cut_threshold = cut_threshold
+
+        self._state = None  # Smoothed output (float32, N x 3)
+        self._prev_input = None  # Last sampled frame, for cut detection
+        self.last_change = 0.0
+        self.cuts = 0
+
+    def configure(self, strength, cut_threshold):
+        self.strength = strength
+        self.cut_threshold = cut_threshold
+
+    def reset(self):
+        self._state = None
+        self._prev_input = None
+
+    def process(self, leds):
+        """'leds' is an (N, 3) array, returns the smoothed float32 (N, 3) array"""
+        current = leds.astype(np.float32, copy=False)
+        prev = self._prev_input
+        self._prev_input = current
+
+        if prev is None or prev.shape != current.shape:
+            self._state = current.copy()
+            return self._state
+
+        # One vectorized pass over the LED buffer, not the screen
+        self.last_change = float(np.abs(current - prev).mean()) if current.size else 0.0
+
+        if self.strength <= 0:
+            self._state = current.copy()
+        elif self.last_change >= self.cut_threshold:
+            self._state = current.copy()
+            self.cuts += 1
+        else:
+            self._state += (current - self._state) * (1.0 - self.strength)
+        return self._state
@@ -9,7 +9,8 @@ class DataTransmitter(ABC):
 
     @abstractmethod
     def send_colors(self, color_data):
-        """Get pixel data by bytes and send it to LEDs"""
+        """Get pixel data by bytes and send it to LEDs.
+        Returns True if the frame reached the strip, False if it was not sent"""
         pass
 
     @abstractmethod
@@ -0,0 +1,202 @@
+import struct
+
+import numpy as np
+
+# ==========================================
+#           Compact Frame Encodings
+# ==========================================
+#
+# Extended Adalight packet, only sent after the device advertised support:
+#   'Adz' | encoding (B) | payload length (H, big endian) | checksum (B) | payload
+#   checksum = encoding ^ len_hi ^ len_lo ^ 0x55
+#
+# Payload formats:
+#   RGB888  raw 8-bit RGB, like plain Adalight
+#   RGB565  2 bytes per LED (lossy, max error 4 on R/B and 2 on G)
+#   RLE     runs of [count (1-255), r, g, b]
+#   DELTA   changed ranges [start (H), count (H), rgb * count] applied
+#           on top of the previous frame
+
+ENC_RGB888 = 0
+ENC_RGB565 = 1
+ENC_RLE = 2
+ENC_DELTA = 3
+
+LOSSLESS_ENCODINGS = (ENC_RGB888, ENC_RLE, ENC_DELTA)
+
+PACKET_MAGIC = b"Adz"
+PACKET_HEADER = struct.Struct(">3sBHB")
+RANGE_HEADER = struct.Struct(">HH")
+
+
+def _as_leds(frame):
+    return np.frombuffer(frame, dtype=np.uint8).reshape(-1, 3)
+
+
+# --- RGB565 ---
+
+
+def encode_rgb565(frame):
+    leds = _as_leds(frame).astype(np.uint16)
+    r = (leds[:, 0] * 31 + 127) // 255
+    g = (leds[:, 1] * 63 + 127) // 255
+    b = (leds[:, 2] * 31 + 127) // 255
+    return ((r << 11) | (g << 5) | b).astype(">u2").tobytes()
+
+
+def decode_rgb565(payload):
+    packed = np.frombuffer(payload, dtype=">u2").astype(np.uint32)
+    r = (((packed >> 11) & 0x1F) * 255 + 15) // 31
+    g = (((packed >> 5) & 0x3F) * 255 + 31) // 63
+    b = ((packed & 0x1F) * 255 + 15) // 31
+    return np.column_stack([r, g, b]).astype(np.uint8).tobytes()
+
+
+# --- Run Length ---
+
+
+def encode_rle(frame):
+    leds = _as_leds(frame)
+    if len(leds) == 0:
+        return b""
+
+    change = np.any(leds[1:] != leds[:-1], axis=1)
+    starts = np.concatenate(([0], np.nonzero(change)[0] + 1))
+    lengths = np.diff(np.append(starts, len(leds)))
+
+    # Split runs longer than 255 into several pieces
+    pieces = (lengths + 254) // 255
+    run_idx = np.repeat(np.arange(len(starts)), pieces)
+    piece_no = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    counts = np.minimum(lengths[run_idx] - piece_no * 255, 255)
+
+    out = np.empty((len(run_idx), 4), dtype=np.uint8)
+    out[:, 0] = counts
+    out[:, 1:] = leds[starts[run_idx]]
+    return out.tobytes()
+
+
+def decode_rle(payload):
+    runs = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 4)
+    return np.repeat(runs[:, 1:], runs[:, 0], axis=0).tobytes()
+
+
+# --- Changed Ranges ---
+
+
+def encode_delta(frame, prev, merge_gap=1):
+    """Only the LED ranges that differ from 'prev'.
+    Gaps up to 'merge_gap' LEDs are merged, a range header costs 4 bytes."""
+    leds = _as_leds(frame)
+    changed = np.any(leds != _as_leds(prev), axis=1).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], changed, [0])))
+    starts = np.nonzero(edges == 1)[0]
+    ends = np.nonzero(edges == -1)[0]
+
+    ranges = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if ranges and start - ranges[-1][1] <= merge_gap:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    out = bytearray()
+    for start, end in ranges:
+        out += RANGE_HEADER.pack(start, end - start)
+        out += leds[start:end].tobytes()
+    return bytes(out)
+
+
+def decode_delta(payload, prev):
+    leds = _as_leds(prev).copy()
+    pos = 0
+    while pos < len(payload):
+        start, count = RANGE_HEADER.unpack_from(payload, pos)
+        pos += RANGE_HEADER.size
+        leds[start : start + count] = _as_leds(payload[pos : pos + count * 3])
+        pos += count * 3
+    return leds.tobytes()
+
+
+# --- Packets ---
+
+
+def build_packet(encoding, payload):
+    length = len(payload)
+    checksum = encoding ^ (length >> 8) ^ (length & 0xFF) ^ 0x55
+    return PACKET_HEADER.pack(PACKET_MAGIC, encoding, length, checksum) + payload
+
+
+def decode_payload(encoding, payload, prev):
+    """Reference decoder, returns the full frame the device ends up showing"""
+    if encoding == ENC_RGB888:
+        return bytes(payload)
+    if encoding == ENC_RGB565:
+        return decode_rgb565(payload)
+    if encoding == ENC_RLE:
+        return decode_rle(payload)
+    if encoding == ENC_DELTA:
+        return decode_delta(payload, prev)
+    raise ValueError(f"Unknown encoding {encoding}")
+
+
+class FrameEncoder:
+    """
+    Picks the smallest encoding the device supports for every frame.
+    Tracks what the device is showing so deltas stay exact even after
+    lossy frames, and forces a full frame every 'keyframe_interval'
+    frames (sent or skipped) so a corrupted packet cannot leave the strip
+    wrong for long, even when the picture stops changing.
+    """
+
+    def __init__(self, encodings, allow_lossy=False, keyframe_interval=60):
+        self.encodings = set(encodings)
+        if not allow_lossy:
+            self.encodings &= set(LOSSLESS_ENCODINGS)
+        self.encodings.add(ENC_RGB888)
+        self.keyframe_interval = keyframe_interval
+        self.reset()
+
+    def reset(self):
+        self.device_frame = None
+        self._since_keyframe = 0
+
+    def encode(self, frame):
+        """Returns a packet, or None when the device already shows 'frame'"""
+        frame = bytes(frame)
+        prev = self.device_frame
+        keyframe = (
+            prev is None
+            or len(prev) != len(frame)
+            or self._since_keyframe >= self.keyframe_interval
+        )
+
+        if not keyframe and prev == frame:
+            # Skipped frames count too, so a static picture still gets
+            # its periodic key frame after a corrupted delta
+            self._since_keyframe += 1
+            return None
+
+        candidates = [(ENC_RGB888, frame)]
+        if ENC_RLE in self.encodings:
+            candidates.append((ENC_RLE, encode_rle(frame)))
+        if ENC_RGB565 in self.encodings:
+            candidates.append((ENC_RGB565, encode_rgb565(frame)))
+        if not keyframe and ENC_DELTA in self.encodings:
+            candidates.append((ENC_DELTA, encode_delta(frame, prev)))
+
+        # Smallest wins, lossless encodings win ties
+        encoding, payload = min(
+            candidates, key=lambda c: (len(c[1]), c[0] not in LOSSLESS_ENCODINGS)
+        )
+
+        if encoding == ENC_DELTA:
+            self._since_keyframe += 1
+        else:
+            self._since_keyframe = 0
+
+        if encoding == ENC_RGB565:
+            self.device_frame = decode_rgb565(payload)
+        else:
+            self.device_frame = frame
+        return build_packet(encoding, payload)
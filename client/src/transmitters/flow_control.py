@@ -0,0 +1,107 @@
+import time
+
+# Device -> host credit line: b"Fc<frames consumed>\r\n"
+CREDIT_PREFIX = b"Fc"
+
+
+class CreditWindow:
+    """
+    Credit based flow control for the serial link.
+
+    At most 'window' frames may be unacknowledged. The device returns one
+    credit per frame it consumed (shown, overwritten by a newer one, or
+    dropped as corrupt), so the host never queues frames in the UART
+    buffers faster than the strip can show them. With a full window the
+    sender waits for a credit, which paces the whole capture loop to the
+    device's consumption rate (the backpressure a full UART used to give,
+    without the queued-up latency).
+
+    Credits lost to line noise would stall the window forever, so a full
+    window with no credit for 'ack_timeout' seconds is reset.
+    """
+
+    def __init__(self, window=2, ack_timeout=0.5):
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self.in_flight = 0
+        self.last_credit = time.monotonic()
+
+        self.frames_sent = 0
+        self.stalls = 0  # Sends that had to wait for a credit
+        self.stall_time = 0.0
+        self.timeouts = 0
+
+        self.consume_interval = None  # Smoothed seconds per consumed frame
+        self._rx = bytearray()
+
+    def has_credit(self):
+        return self.in_flight < self.window
+
+    def expire(self, now=None):
+        """No credit in time: assume the acks got lost and start over"""
+        if now is None:
+            now = time.monotonic()
+        self.timeouts += 1
+        self.in_flight = 0
+        self.last_credit = now
+
+    def on_sent(self):
+        if self.in_flight == 0:
+            # Idle gaps are not consumption time
+            self.last_credit = time.monotonic()
+        self.in_flight += 1
+        self.frames_sent += 1
+
+    def feed(self, data, now=None):
+        """Parses bytes read from the device, returns the credits found"""
+        if now is None:
+            now = time.monotonic()
+        self._rx += data
+
+        credits = 0
+        while True:
+            end = self._rx.find(b"\n")
+            if end == -1:
+                break
+            line = bytes(self._rx[:end]).strip()
+            del self._rx[: end + 1]
+            if line.startswith(CREDIT_PREFIX):
+                try:
+                    credits += int(line[len(CREDIT_PREFIX) :])
+                except ValueError:
+                    pass  # Garbled line, the timeout covers it
+
+        # Don't let unrelated output (debug prints) grow the buffer
+        if len(self._rx) > 256:
+            del self._rx[:-256]
+
+        if credits:
+            self._on_credits(credits, now)
+        return credits
+
+    def _on_credits(self, credits, now):
+        if self.in_flight > 0:
+            interval = (now - self.last_credit) / credits
+            if self.consume_interval is None:
+                self.consume_interval = interval
+            else:
+                self.consume_interval += (interval - self.consume_interval) * 0.1
+        self.in_flight = max(self.in_flight - credits, 0)
+        self.last_credit = now
+
+    def device_fps(self):
+        """Frames per second the device is consuming (0 = unknown)"""
+        if not self.consume_interval:
+            return 0.0
+        return 1.0 / self.consume_interval
+
+    def stats(self):
+        return {
+            "window": self.window,
+            "in_flight": self.in_flight,
+            "frames_sent": self.frames_sent,
+            "stalls": self.stalls,
+            "stall_ms": round(self.stall_time * 1000, 1),
+            "timeouts": self.timeouts,
+            "device_fps": round(self.device_fps(), 1),
+        }
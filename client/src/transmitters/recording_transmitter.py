@@ -0,0 +1,30 @@
+from src.frame_recorder import FrameRecorder
+from src.transmitters.data_transmitter import DataTransmitter
+
+
+class RecordingTransmitter(DataTransmitter):
+    """
+    Wraps another transmitter and records every color frame
+    it sends, exactly as it goes out to the strip.
+    """
+
+    def __init__(self, transmitter: DataTransmitter, path: str, recorder=None):
+        self.transmitter = transmitter
+        # An existing recorder continues the same file (transmitter swaps)
+        self.recorder = recorder if recorder is not None else FrameRecorder(path)
+
+    def connect(self):
+        self.transmitter.connect()
+
+    def send_colors(self, color_data):
+        sent = self.transmitter.send_colors(color_data)
+        if sent:
+            self.recorder.write_frame(color_data)
+        return sent
+
+    def send_command(self, command_dict):
+        self.transmitter.send_command(command_dict)
+
+    def disconnect(self):
+        self.transmitter.disconnect()
+        self.recorder.close()
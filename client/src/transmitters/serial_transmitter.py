@@ -3,15 +3,39 @@ import time
 import struct
 import json
 from src.transmitters.data_transmitter import DataTransmitter
+from src.transmitters.encodings import FrameEncoder
+from src.transmitters.flow_control import CreditWindow
+
+# Tried from fastest to slowest during the high speed handshake
+HIGH_SPEED_BAUD_RATES = (2000000, 1000000, 921600, 500000, 460800, 230400)
 
 
 class SerialTransmitter(DataTransmitter):
-    def __init__(self, port, baud_rate):
+    def __init__(
+        self,
+        port,
+        baud_rate,
+        high_speed=False,
+        allow_lossy=False,
+        flow_control=False,
+        flow_window=2,
+    ):
         self.port = port
         self.baud_rate = baud_rate
         self.ser = None
         self.is_connected = False
 
+        # High speed mode (negotiated, falls back to plain Adalight)
+        self.high_speed = high_speed
+        self.allow_lossy = allow_lossy
+        self.active_baud = baud_rate
+        self.encoder = None
+
+        # Acknowledged streaming (negotiated, falls back to fire and forget)
+        self.flow_control = flow_control
+        self.flow_window = flow_window
+        self.flow = None
+
         self.connect()
 
     def connect(self):
@@ -27,6 +51,15 @@ class SerialTransmitter(DataTransmitter):
             # Waiting On ESP Reset
             time.sleep(2)
 
+            self.active_baud = self.baud_rate
+            self.encoder = None
+            if self.high_speed:
+                self._negotiate_high_speed()
+
+            self.flow = None
+            if self.flow_control:
+                self._negotiate_flow_control()
+
         except serial.SerialException as e:
             print(f"[Serial] Connection failed: {e}")
             self.is_connected = False
@@ -36,17 +69,25 @@ class SerialTransmitter(DataTransmitter):
         Gets bytes array that represents color data,
         builds the packet with header,
         handles reconnecting.
+        Returns True once the strip has (or already shows) the frame.
         """
         if not self.is_connected:
             # Should add cooldown (?)
             self.connect()
             if not self.is_connected:
-                return
+                return False
+
+        # Window full: block until the device has caught up
+        if self.flow is not None:
+            self._wait_for_credit()
+
+        if self.encoder is not None:
+            return self._send_encoded(color_data)
 
         # Ada Light Protocol
         num_leds = len(color_data) // 3
         if num_leds == 0:
-            return
+            return False
 
         count = num_leds - 1
 
@@ -60,19 +101,187 @@ class SerialTransmitter(DataTransmitter):
 
         try:
             if self.ser is None:
-                return
+                return False
             self.ser.write(header + color_data)
-            # Depends on performance could add:
-            # time.sleep(0.001)
+            if self.flow is not None:
+                self.flow.on_sent()
+            return True
         except (serial.SerialException, OSError):
             print("[Serial] Lost connection! Reconnecting...")
             self.is_connected = False
             try:
                 if self.ser is None:
-                    return
+                    return False
                 self.ser.close()
             except Exception:
                 pass
+            return False
+
+    def _send_encoded(self, color_data):
+        """Compact 'Adz' packet, only after a successful handshake"""
+        packet = self.encoder.encode(color_data)
+        if packet is None:
+            return True  # Strip already shows this frame
+
+        try:
+            self.ser.write(packet)
+            if self.flow is not None:
+                self.flow.on_sent()
+            return True
+        except (serial.SerialException, OSError):
+            print("[Serial] Lost connection! Reconnecting...")
+            self.is_connected = False
+            self.encoder = None
+            return False
+
+    # ==========================================
+    #           High Speed Handshake
+    # ==========================================
+
+    def _read_reply(self, prefix, timeout=0.5):
+        """
+        Waits for a '<prefix>{json}' line from the device.
+        Other lines (firmware debug prints) are skipped.
+        """
+        deadline = time.monotonic() + timeout
+        old_timeout = self.ser.timeout
+        self.ser.timeout = 0.05
+        try:
+            while time.monotonic() < deadline:
+                line = self.ser.readline().strip()
+                if not line.startswith(prefix):
+                    continue
+                try:
+                    return json.loads(line[len(prefix) :].decode("utf-8"))
+                except ValueError:
+                    return None
+            return None
+        finally:
+            self.ser.timeout = old_timeout
+
+    def _request(self, command_dict, prefix, timeout=0.5):
+        self.ser.write(b"Cmd" + json.dumps(command_dict).encode("utf-8") + b"\n")
+        return self._read_reply(prefix, timeout)
+
+    def _negotiate_high_speed(self):
+        """
+        Asks the device for its capabilities, then moves to the fastest
+        baud rate that survives a ping. Devices that don't answer
+        (older firmware) keep the plain Adalight protocol.
+        """
+        try:
+            self.ser.reset_input_buffer()
+            caps = self._request({"cmd": "caps"}, b"Caps")
+            if not caps:
+                print("[Serial] Device has no high speed mode, using Adalight.")
+                return
+
+            supported = set(caps.get("baud", []))
+            for baud in HIGH_SPEED_BAUD_RATES:
+                if baud <= self.active_baud or baud not in supported:
+                    continue
+                if self._try_baud(baud):
+                    break
+
+            self.encoder = FrameEncoder(
+                caps.get("enc", []), allow_lossy=self.allow_lossy
+            )
+            print(
+                f"[Serial] High speed mode @ {self.active_baud}, "
+                f"encodings {sorted(self.encoder.encodings)}"
+            )
+        except (serial.SerialException, OSError) as e:
+            print(f"[Serial] High speed handshake failed: {e}")
+
+    def _try_baud(self, baud):
+        """Switches both ends to 'baud', reverts if the ping fails.
+        The device reverts on its own when no ping arrives."""
+        ack = self._request({"cmd": "baud", "value": baud}, b"Ack")
+        if not ack or ack.get("value") != baud:
+            return False
+
+        previous = self.ser.baudrate
+        self.ser.baudrate = baud
+        self.ser.reset_input_buffer()
+        if self._request({"cmd": "ping"}, b"Pong") is not None:
+            self.active_baud = baud
+            return True
+
+        print(f"[Serial] {baud} baud failed, staying at {previous}")
+        self.ser.baudrate = previous
+        time.sleep(0.1)  # Give the device time to revert
+        self.ser.reset_input_buffer()
+        return False
+
+    # ==========================================
+    #           Flow Control
+    # ==========================================
+
+    def _negotiate_flow_control(self):
+        """
+        Asks the device to acknowledge consumed frames. Devices that don't
+        answer (older firmware) keep receiving frames unacknowledged.
+        """
+        try:
+            self.ser.reset_input_buffer()
+            ack = self._request(
+                {"cmd": "flow", "window": self.flow_window}, b"Ack", timeout=0.5
+            )
+        except (serial.SerialException, OSError) as e:
+            print(f"[Serial] Flow control handshake failed: {e}")
+            return
+
+        if not ack or ack.get("cmd") != "flow":
+            print("[Serial] Device has no flow control, sending unacknowledged.")
+            return
+
+        # The device may grant a smaller window than asked for
+        window = int(ack.get("window", self.flow_window))
+        self.flow = CreditWindow(max(window, 1))
+        print(f"[Serial] Flow control on, {self.flow.window} frames in flight")
+
+    def _poll_credits(self):
+        """Drains pending credit lines without blocking"""
+        try:
+            waiting = self.ser.in_waiting
+            if waiting:
+                self.flow.feed(self.ser.read(waiting))
+        except (serial.SerialException, OSError):
+            pass  # The write below will notice a dead port
+
+    def _wait_for_credit(self):
+        """
+        Blocks (reading credits) while the window is full, at most
+        'ack_timeout'. This is what paces the worker to the device.
+        """
+        flow = self.flow
+        self._poll_credits()
+        if flow.has_credit():
+            return
+
+        flow.stalls += 1
+        start = time.monotonic()
+        deadline = start + flow.ack_timeout
+        old_timeout = self.ser.timeout
+        try:
+            while not flow.has_credit():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    flow.expire()
+                    break
+                self.ser.timeout = remaining
+                data = self.ser.read(max(self.ser.in_waiting, 1))
+                if data:
+                    flow.feed(data)
+        except (serial.SerialException, OSError):
+            pass  # The write will notice a dead port
+        finally:
+            self.ser.timeout = old_timeout
+            flow.stall_time += time.monotonic() - start
+
+    def flow_stats(self):
+        """Flow control counters, None when not negotiated"""
+        return self.flow.stats() if self.flow is not None else None
 
     def send_command(self, command_dict):
         """Sends a JSON command using 'Cmd' protocol.
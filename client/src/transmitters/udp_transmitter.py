@@ -44,14 +44,16 @@ class UdpTransmitter(DataTransmitter):
             print(f"[UDP Send Error] {e}")
 
     def send_colors(self, color_data: bytes):
-        """Sends raw color data by bytes"""
+        """Sends raw color data by bytes, returns True if it went out"""
         if not self.sock or not self.resolved_ip:
-            return
+            return False
 
         try:
             self.sock.sendto(color_data, (self.resolved_ip, self.port))
+            return True
         except Exception as e:
             print(f"[UDP Send Error] {e}")
+            return False
 
     def disconnect(self):
         if self.sock:
@@ -0,0 +1,120 @@
+import customtkinter as ctk
+import numpy as np
+
+
+class LedPreview(ctk.CTkFrame):
+    """
+    Draws the current LED colors around a screen outline.
+    Reads the newest frame from the shared FrameBuffer on the Tk thread,
+    at most 'max_fps' times per second, and only touches LEDs that changed.
+    """
+
+    def __init__(self, parent, frame_buffer, max_fps=20):
+        super().__init__(parent)
+        self.frame_buffer = frame_buffer
+        self.interval_ms = int(1000 / max_fps)
+
+        self.canvas = ctk.CTkCanvas(self, bg="#1a1a1a", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+
+        self._rects = []  # Canvas item per LED, in strip order
+        self._layout = None
+        self._drawn = None  # Frame currently on the canvas (uint8 array)
+        self._drawn_seq = -1
+        self._job = None
+
+        self.canvas.bind("<Configure>", lambda event: self._rebuild())
+        self._job = self.after(self.interval_ms, self._refresh)
+
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
+
+    # ==========================================
+    #           Geometry
+    # ==========================================
+
+    def _rebuild(self, layout=None):
+        """(Re)creates one rectangle per LED for the current canvas size"""
+        if layout is not None:
+            self._layout = layout
+        if self._layout is None:
+            return
+
+        self.canvas.delete("all")
+        self._rects = []
+        self._drawn = None
+        self._drawn_seq = -1
+
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        pad = 16
+        x0, y0, x1, y1 = pad, pad, width - pad, height - pad
+        if x1 - x0 < 20 or y1 - y0 < 20:
+            return
+
+        self.canvas.create_rectangle(
+            x0 + pad, y0 + pad, x1 - pad, y1 - pad, outline="#555555", width=2
+        )
+
+        left, top, right, bottom = self._layout
+        size = pad - 4
+
+        # Same order as ScreenGrabber: left bottom->top, top left->right,
+        # right top->bottom, bottom right->left
+        for i in range(left):
+            y = y1 - pad - (i + 0.5) * (y1 - y0 - 2 * pad) / left
+            self._add_led(x0 + pad / 2, y, size)
+        for i in range(top):
+            x = x0 + pad + (i + 0.5) * (x1 - x0 - 2 * pad) / top
+            self._add_led(x, y0 + pad / 2, size)
+        for i in range(right):
+            y = y0 + pad + (i + 0.5) * (y1 - y0 - 2 * pad) / right
+            self._add_led(x1 - pad / 2, y, size)
+        for i in range(bottom):
+            x = x1 - pad - (i + 0.5) * (x1 - x0 - 2 * pad) / bottom
+            self._add_led(x, y1 - pad / 2, size)
+
+    def _add_led(self, x, y, size):
+        half = size / 2
+        rect = self.canvas.create_rectangle(
+            x - half, y - half, x + half, y + half, fill="#000000", outline=""
+        )
+        self._rects.append(rect)
+
+    # ==========================================
+    #           Redraw
+    # ==========================================
+
+    def _refresh(self):
+        self._job = self.after(self.interval_ms, self._refresh)
+
+        # Hidden tab, nothing to draw
+        if not self.winfo_ismapped():
+            return
+
+        seq, frame, layout = self.frame_buffer.latest()
+        if seq == self._drawn_seq:
+            return
+
+        if layout != self._layout:
+            self._rebuild(layout)
+
+        colors = np.frombuffer(frame, dtype=np.uint8).reshape(-1, 3)
+        count = min(len(colors), len(self._rects))
+        colors = colors[:count]
+
+        if self._drawn is not None and len(self._drawn) == count:
+            changed = np.nonzero(np.any(colors != self._drawn, axis=1))[0]
+        else:
+            changed = np.arange(count)
+
+        itemconfigure = self.canvas.itemconfigure
+        rects = self._rects
+        for i, (r, g, b) in zip(changed.tolist(), colors[changed].tolist()):
+            itemconfigure(rects[i], fill=f"#{r:02x}{g:02x}{b:02x}")
+
+        self._drawn = colors.copy()
+        self._drawn_seq = seq
@@ -1,5 +1,7 @@
 import customtkinter as ctk
 
+from src.ui.led_preview import LedPreview
+
 
 class CalibrationTab(ctk.CTkFrame):
     def __init__(self, parent, app_controller):
@@ -9,10 +11,14 @@ class CalibrationTab(ctk.CTkFrame):
         self._setup_ui()
 
     def _setup_ui(self):
+        # -- Live LED Preview --
+        self.preview = LedPreview(self, self.app.frame_buffer)
+        self.preview.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
         lbl_info = ctk.CTkLabel(
             self,
-            text="Calibration Area\n(Here we will adjust Screen Crop & Depth)",
-            font=("Roboto", 20),
+            text="Live strip preview\n(Screen Crop & Depth controls coming here)",
+            font=("Roboto", 14),
             text_color="gray",
         )
-        lbl_info.pack(expand=True)
+        lbl_info.pack(pady=(0, 10))
@@ -1,7 +1,42 @@
+import gc
+import os
 import sys
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 sys.modules["mss"] = MagicMock()
 sys.modules["pystray"] = MagicMock()
 sys.modules["PIL"] = MagicMock()
 sys.modules["PIL.Image"] = MagicMock()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_config_file(tmp_path_factory):
+    """
+    Saves made during tests (including debounced ones that fire after a
+    test finished) go to a temp folder, never to the developer's config.json.
+    """
+    from src.config_manager import ConfigManager
+
+    real_path = ConfigManager.get_local_path(None)
+    before = _snapshot_file(real_path)
+
+    test_path = str(tmp_path_factory.mktemp("config") / "config.json")
+    with patch.object(ConfigManager, "get_local_path", return_value=test_path):
+        yield test_path
+
+        # Write debounced saves that are still pending while the patch is active
+        for obj in gc.get_objects():
+            if isinstance(obj, ConfigManager):
+                obj.flush()
+
+    assert _snapshot_file(real_path) == before, f"Tests wrote to {real_path}"
+
+
+def _snapshot_file(path):
+    try:
+        with open(path, "rb") as f:
+            return os.stat(path).st_mtime_ns, f.read()
+    except FileNotFoundError:
+        return None
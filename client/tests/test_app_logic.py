@@ -1,8 +1,12 @@
+import threading
+import time
 import pytest
 from typing import cast
 from unittest.mock import patch, MagicMock
 from src.models import AppMode
 from src.app_controller import AmbilightApp
+from src.auto_suspend import AutoSuspend
+from src.frame_recorder import FrameReader
 
 
 @pytest.mark.parametrize(
@@ -36,3 +40,147 @@ def test_set_mode_sends_correct_commands(
 
     # 3. Assert
     mock_instance.send_command.assert_called_once_with(expected_cmd)
+
+
+@patch("src.app_controller.SerialTransmitter")
+def test_worker_wakes_immediately_on_mode_change(MockSerialTransmitter):
+    """Idle worker blocks on an event instead of polling"""
+    app = AmbilightApp()
+    app.suspend = None
+    grabbed = threading.Event()
+    app.grabber = MagicMock()
+    app.grabber.get_frame_bytes.side_effect = lambda snapshot: grabbed.set()
+
+    app.start_worker_thread()
+    time.sleep(0.05)  # Let the worker reach its idle wait
+    app.grabber.pause_watcher.assert_called()  # No display polling while idle
+    app.grabber.resume_watcher.assert_not_called()
+
+    start = time.perf_counter()
+    app.set_mode(AppMode.AMBILIGHT)
+    assert grabbed.wait(1.0)
+    assert time.perf_counter() - start < 0.1
+    app.grabber.resume_watcher.assert_called()
+
+    app.stop_all()
+    app.led_thread.join(timeout=1.0)
+    assert not app.led_thread.is_alive()
+
+
+@patch("src.app_controller.SerialTransmitter")
+def test_connection_change_rebuilds_transmitter(MockSerialTransmitter):
+    """Only transmitter keys swap the connection, on the worker thread"""
+    app = AmbilightApp()
+    old = app.serial_comm
+
+    with patch.object(app.config_mgr, "_save_local_config"):
+        app.config_mgr.set_nested("client", "gamma", 2.4)
+        assert not app._transmitter_stale
+
+        app.config_mgr.set_nested("client", "com_port", "COM7")
+        assert app._transmitter_stale
+
+        app.start_worker_thread()
+        time.sleep(0.05)
+        app.stop_all()
+        app.led_thread.join(timeout=1.0)
+
+    old.disconnect.assert_called()
+    assert MockSerialTransmitter.call_count == 2
+    assert MockSerialTransmitter.call_args.kwargs["port"] == "COM7"
+
+
+@patch("src.app_controller.SerialTransmitter")
+def test_old_wake_does_not_cut_suspend_short(MockSerialTransmitter):
+    """A config change made while capturing doesn't restart the pause timer"""
+    app = AmbilightApp()
+    app.suspend = AutoSuspend(black_timeout=0.05, probe_interval=0.02)
+    app.suspend.reset = MagicMock(wraps=app.suspend.reset)
+    app.grabber = MagicMock()
+    app.grabber.get_frame_bytes.return_value = bytes(30)
+
+    app.start_worker_thread()
+    app.set_mode(AppMode.AMBILIGHT)
+    time.sleep(0.02)
+    with patch.object(app.config_mgr, "_save_local_config"):
+        app.config_mgr.set_nested("client", "gamma", 2.4)  # Before the pause
+        app.config_mgr.flush()
+    app.suspend.reset.reset_mock()
+
+    deadline = time.monotonic() + 1.0
+    while not app.suspend.suspended and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)  # Several probes
+
+    assert app.suspend.suspended
+    app.suspend.reset.assert_not_called()
+
+    app.stop_all()
+    app.led_thread.join(timeout=1.0)
+
+
+@patch("src.app_controller.SerialTransmitter")
+def test_swap_keeps_recording(MockSerialTransmitter, tmp_path):
+    """Reconnecting must not truncate the session recording"""
+    path = str(tmp_path / "session.rec")
+    app = AmbilightApp()
+    app.config_mgr.set_nested("client", "record_path", path)
+    app._swap_transmitter()
+
+    for i in range(200):
+        app.serial_comm.send_colors(bytes([i % 256]) * 9)
+    app.config_mgr.set_nested("client", "com_port", "COM7")
+    app._swap_transmitter()
+    for i in range(10):
+        app.serial_comm.send_colors(bytes([i]) * 9)
+    app.serial_comm.disconnect()
+
+    with FrameReader(path) as reader:
+        assert len(reader) == 210
+
+
+def test_set_mode_during_swap_uses_new_transmitter():
+    """
+    The old transmitter is never revived by a command racing the swap,
+    and set_mode() doesn't wait for the new port to connect
+    """
+    old, new = MagicMock(name="old"), MagicMock(name="new")
+
+    def slow_connect(**kwargs):
+        time.sleep(0.3)  # Real ports wait for the ESP to reset
+        return new
+
+    with patch("src.app_controller.SerialTransmitter", return_value=old) as Mock:
+        app = AmbilightApp()
+        Mock.side_effect = slow_connect
+        swap = threading.Thread(target=app._swap_transmitter)
+        swap.start()
+        time.sleep(0.02)
+        start = time.perf_counter()
+        app.set_mode(AppMode.RAINBOW)
+        assert time.perf_counter() - start < 0.1
+        swap.join()
+
+    old.disconnect.assert_called_once()
+    old.send_command.assert_not_called()
+    new.send_command.assert_called_once_with({"cmd": "mode", "value": "rainbow"})
+
+
+@patch("src.app_controller.SerialTransmitter")
+def test_unsent_frames_are_not_counted(MockSerialTransmitter):
+    """Frames the transmitter didn't write never reach stats or the preview"""
+    app = AmbilightApp()
+    app.suspend = None
+    app.serial_comm.send_colors.return_value = False
+    app.grabber = MagicMock()
+    app.grabber.get_frame_bytes.return_value = bytes(30)
+
+    app.start_worker_thread()
+    app.set_mode(AppMode.AMBILIGHT)
+    time.sleep(0.05)
+    app.stop_all()
+    app.led_thread.join(timeout=1.0)
+
+    assert app.serial_comm.send_colors.call_count > 1
+    assert app.frames_sent == 0
+    assert app.frame_buffer.latest()[0] == 0
@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.auto_suspend import AutoSuspend
+
+BLACK = bytes(30)
+PICTURE = bytes([200]) * 30
+
+
+@pytest.fixture(autouse=True)
+def unlocked():
+    with patch("src.auto_suspend.is_screen_locked", return_value=False) as mock:
+        yield mock
+
+
+def test_black_screen_suspends_and_resumes():
+    suspend = AutoSuspend(black_timeout=5, static_timeout=100)
+
+    assert suspend.observe(BLACK, now=0.0) is False
+    assert suspend.observe(bytes([1]) * 30, now=4.0) is False
+    assert suspend.observe(BLACK, now=5.0) is True
+    assert suspend.reason == "black screen"
+
+    # Still black (even if slightly different) keeps the pause
+    assert suspend.observe(bytes([2]) * 30, now=6.0) is True
+
+    assert suspend.observe(PICTURE, now=7.0) is False
+    assert not suspend.suspended
+
+
+def test_static_picture_suspends_until_change():
+    suspend = AutoSuspend(static_timeout=10)
+
+    assert suspend.observe(PICTURE, now=0.0) is False
+    assert suspend.observe(PICTURE, now=9.0) is False
+    assert suspend.observe(PICTURE, now=10.0) is True
+    assert suspend.reason == "no change"
+
+    changed = PICTURE[:-1] + b"\x00"
+    assert suspend.observe(changed, now=11.0) is False
+
+
+def test_dither_noise_is_not_a_change():
+    suspend = AutoSuspend(static_timeout=10)
+    noisy = bytes([201]) * 30
+
+    for t in range(11):
+        result = suspend.observe(PICTURE if t % 2 else noisy, now=float(t))
+
+    assert result is True
+    assert suspend.reason == "no change"
+
+
+def test_lock_screen(unlocked):
+    suspend = AutoSuspend(lock_check_interval=0)
+
+    unlocked.return_value = True
+    assert suspend.observe(PICTURE, now=1.0) is True
+    assert suspend.reason == "screen locked"
+
+    unlocked.return_value = False
+    assert suspend.observe(PICTURE, now=2.0) is False
@@ -1,5 +1,11 @@
+import json
 import os
 import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
 from src.config_manager import ConfigManager
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -36,3 +42,122 @@ def test_default_ConfigManager():
         },
     }
     assert cfg.config == expected_config
+
+
+def test_set_nested_publishes_new_snapshot():
+    """Readers holding an old snapshot never see a partial update"""
+    cfg = ConfigManager()
+    old = cfg.snapshot
+
+    new = cfg.set_nested("client", "layout", {"left": 1, "top": 2, "right": 3})
+
+    assert cfg.snapshot is new
+    assert new.generation == old.generation + 1
+    assert new.layout == (1, 2, 3, 0)
+    assert old.layout == (10, 20, 10, 20)
+
+
+def test_set_nested_debounces_saves():
+    """A burst of changes (slider drag) ends in a single write"""
+    cfg = ConfigManager()
+    cfg.save_delay = 0.05
+    saved = []
+
+    threads = threading.active_count()
+
+    with patch.object(cfg, "_save_local_config", side_effect=saved.append):
+        for gamma in (2.0, 2.1, 2.2, 2.3):
+            cfg.set_nested("client", "gamma", gamma)
+        assert saved == []
+        assert threading.active_count() == threads + 1  # One saver, no timers
+        time.sleep(0.2)
+
+        cfg.set_nested("client", "gamma", 2.4)  # Same saver, later deadline
+        time.sleep(0.2)
+
+    assert [data["client"]["gamma"] for data in saved] == [2.3, 2.4]
+    assert threading.active_count() == threads + 1
+
+
+def test_save_is_atomic(tmp_path):
+    """The old file stays intact if writing the new one fails"""
+    cfg = ConfigManager()
+    path = tmp_path / "config.json"
+    path.write_text('{"client": {"gamma": 1.8}}')
+
+    with patch.object(cfg, "get_local_path", return_value=str(path)):
+        with patch("src.config_manager.json.dump", side_effect=OSError("disk full")):
+            cfg._save_local_config(cfg.config)
+        assert json.loads(path.read_text()) == {"client": {"gamma": 1.8}}
+        assert os.listdir(tmp_path) == ["config.json"]
+
+        path.chmod(0o640)
+        cfg._save_local_config(cfg.config)
+    assert json.loads(path.read_text()) == cfg.config
+    if os.name == "posix":
+        assert path.stat().st_mode & 0o777 == 0o640
+
+
+def test_named_devices_use_their_own_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"client": {"gamma": 1.8}}')
+
+    desk = ConfigManager("desk")
+    with patch.object(desk, "get_local_path", return_value=str(path)):
+        desk.load_local_config()  # Creates config-desk.json with defaults
+        desk.set_nested("client", "gamma", 2.6)
+        desk.flush()
+
+    assert json.loads(path.read_text()) == {"client": {"gamma": 1.8}}
+    saved = json.loads((tmp_path / "config-desk.json").read_text())
+    assert saved["client"]["gamma"] == 2.6
+
+
+def test_only_affected_groups_are_notified():
+    cfg = ConfigManager()
+    calls = {"grabber": 0, "transmitter": 0, "smoothing": 0}
+    for group in calls:
+        cfg.subscribe(
+            group, lambda snapshot, g=group: calls.__setitem__(g, calls[g] + 1)
+        )
+
+    with patch.object(cfg, "_save_local_config"):
+        cfg.set_nested("client", "smoothing", 0.5)
+        cfg.set_nested("client", "com_port", "COM7")
+        cfg.flush()
+
+    assert calls == {"grabber": 0, "transmitter": 1, "smoothing": 1}
+
+
+def test_invalid_values_are_rejected_atomically(tmp_path):
+    """A bad value (from a command or a hand edited file) never sticks"""
+    cfg = ConfigManager()
+    with pytest.raises(ValueError):
+        cfg.set_nested("client", "gamma", "abc")
+    assert cfg.get_nested("client", "gamma") == 2.2
+    assert not cfg._dirty
+
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"client": {"gamma": "abc", "depth": 80}}))
+    with patch.object(cfg, "get_local_path", return_value=str(path)):
+        cfg.load_local_config()
+
+    assert cfg.get_nested("client", "depth") == 100
+    assert cfg.publish().gamma == 2.2
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("smoothing", 1.0),
+        ("smoothing", -0.1),
+        ("smoothing", float("nan")),
+        ("scene_cut_threshold", -1.0),
+    ],
+)
+def test_smoothing_settings_are_range_checked(key, value):
+    cfg = ConfigManager()
+    with pytest.raises(ValueError):
+        cfg.set_nested("client", key, value)
+    assert cfg.snapshot.smoothing == 0.0
+    assert cfg.snapshot.scene_cut_threshold == 40.0
@@ -0,0 +1,135 @@
+import os
+import socket
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.app_controller import AmbilightApp
+from src.control_server import ControlServer, send_commands, token_path
+from src.models import AppMode
+
+
+@pytest.fixture
+def app():
+    with patch("src.app_controller.SerialTransmitter"):
+        yield AmbilightApp()
+
+
+@pytest.fixture
+def server(app, tmp_path):
+    if hasattr(socket, "AF_UNIX"):
+        address = str(tmp_path / "ctl.sock")
+    else:
+        address = ("127.0.0.1", 0)
+    srv = ControlServer({"desk": app}, address).start()
+    yield srv
+    srv.stop()
+
+
+def test_single_command(server, app):
+    reply = send_commands(
+        {"cmd": "set_mode", "mode": "static", "color": [0, 0, 255]}, server.address
+    )
+
+    assert reply == {"ok": True, "result": "static"}
+    assert app.current_mode == AppMode.STATIC
+    app.serial_comm.send_command.assert_called_with(
+        {"cmd": "mode", "value": "static", "color": [0, 0, 255]}
+    )
+
+
+def test_batch_runs_in_order(server, app):
+    generation = app.config_mgr.snapshot.generation
+
+    replies = send_commands(
+        [
+            {"cmd": "set", "section": "client", "key": "gamma", "value": 2.4},
+            {"cmd": "set_mode", "mode": "ambilight", "device": "desk"},
+            {"cmd": "set_mode", "mode": "disco"},
+            {"cmd": "stats", "device": "tv"},
+            {"cmd": "stats"},
+        ],
+        server.address,
+    )
+
+    assert replies[0] == {"ok": True, "result": generation + 1}
+    assert replies[1]["ok"] is True
+    assert replies[2]["ok"] is False
+    assert replies[3] == {"ok": False, "error": "Unknown device: tv"}
+    assert replies[4]["result"]["mode"] == "ambilight"
+    assert app.config_mgr.snapshot.gamma == 2.4
+
+
+def test_invalid_set_changes_nothing(server, app):
+    before = dict(app.config_mgr.config["client"])
+    generation = app.config_mgr.snapshot.generation
+
+    replies = send_commands(
+        [
+            {"cmd": "set", "section": "client", "key": "gamma", "value": "abc"},
+            {"cmd": "set", "section": "client", "key": "layout", "value": [1, 2]},
+            {"cmd": "set", "section": "client", "key": "depth", "value": "80"},
+        ],
+        server.address,
+    )
+
+    assert [r["ok"] for r in replies] == [False, False, True]
+    assert app.config_mgr.config["client"] == dict(before, depth=80)
+    assert app.config_mgr.snapshot.generation == generation + 1
+    assert app.config_mgr._dirty == {("client", "depth")}
+
+
+def test_commands_cost_little(server):
+    """Round trips stay cheap, the worker is never blocked by them"""
+    send_commands({"cmd": "ping"}, server.address)
+    start = time.perf_counter()
+    replies = send_commands([{"cmd": "stats"}] * 100, server.address)
+    assert all(r["ok"] for r in replies)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_set_only_accepts_whitelisted_keys(server, app):
+    replies = send_commands(
+        [
+            {"cmd": "set", "section": "client", "key": "record_path", "value": "x"},
+            {"cmd": "set", "section": "client", "key": "trace_path", "value": "x"},
+            {"cmd": "set", "section": "network", "key": "hostname", "value": "x"},
+            {"cmd": "set", "section": "junk", "key": "junk", "value": 1},
+        ],
+        server.address,
+    )
+
+    assert not any(r["ok"] for r in replies)
+    assert "record_path" not in app.config_mgr.config["client"]
+    assert "junk" not in app.config_mgr.config
+    assert not app.config_mgr._dirty
+
+
+def test_non_json_line_closes_connection(server, app):
+    family = socket.AF_UNIX if isinstance(server.address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(2.0)
+        sock.connect(server.address)
+        # What a browser form POST to the port would look like
+        sock.sendall(b'POST / HTTP/1.1\r\n\r\n{"cmd": "stop"}\n')
+        with sock.makefile("rb") as reader:
+            assert b"Bad JSON" in reader.readline()
+            assert reader.readline() == b""
+
+    assert app.current_mode == AppMode.OFF
+
+
+def test_tcp_requires_token(app):
+    srv = ControlServer(app, ("127.0.0.1", 0)).start()
+    try:
+        port = srv.address[1]
+        if os.name == "posix":
+            assert os.stat(token_path(port)).st_mode & 0o777 == 0o600
+
+        reply = send_commands({"cmd": "ping"}, srv.address, token="wrong")
+        assert reply == {"ok": False, "error": "Bad token"}
+        assert send_commands({"cmd": "ping"}, srv.address)["result"] == "pong"
+    finally:
+        srv.stop()
+    assert not os.path.exists(token_path(port))
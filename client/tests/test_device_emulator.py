@@ -0,0 +1,108 @@
+import os
+import struct
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.app_controller import AmbilightApp
+from src.config_manager import ConfigManager
+from src.device_emulator import DeviceEmulator
+from src.transmitters.serial_transmitter import SerialTransmitter
+from src.transmitters.udp_transmitter import UdpTransmitter
+
+NUM_LEDS = 10
+
+
+def _ada_packet(payload, chk_xor=0):
+    count = len(payload) // 3 - 1
+    hi, lo = (count >> 8) & 0xFF, count & 0xFF
+    return struct.pack(">3sBBB", b"Ada", hi, lo, hi ^ lo ^ 0x55 ^ chk_xor) + payload
+
+
+@pytest.fixture
+def device():
+    dev = DeviceEmulator(num_leds=NUM_LEDS, enable_serial=False)
+    dev.start()
+    yield dev
+    dev.stop()
+
+
+def test_parser_frames_commands_and_corruption(device):
+    frame = bytes(range(NUM_LEDS * 3))
+
+    # Split across chunks like a real UART would deliver it
+    packet = _ada_packet(frame)
+    device.feed(packet[:4])
+    device.feed(packet[4:])
+    assert device.wait_for_frame() == frame
+
+    device.feed(_ada_packet(frame, chk_xor=0xFF))
+    device.feed(b'Cmd{"cmd": "mode", "value": "rainbow"}\n')
+    device.feed(b"Cmd{not json}\n")
+
+    stats = device.stats.report()
+    assert stats["frames_received"] == 1
+    assert stats["corrupt_packets"] == 1
+    assert stats["commands"] == 1
+    assert stats["bad_commands"] == 1
+    assert device.mode == "rainbow"
+
+
+def test_udp_transmitter_loopback(device):
+    tx = UdpTransmitter("127.0.0.1", device.udp_port)
+    frame = bytes([7]) * (NUM_LEDS * 3)
+
+    tx.send_command({"cmd": "mode", "value": "ambilight"})
+    tx.send_colors(frame)
+
+    assert device.wait_for_frame() == frame
+    assert device.mode == "ambilight"
+    assert device.stats.report()["latency_avg_ms"] > 0
+    tx.disconnect()
+
+
+def test_sync_with_esp_reads_config_endpoint(device):
+    cfg = ConfigManager()
+
+    with patch.object(cfg, "_save_local_config") as save:
+        cfg.sync_with_esp(address=device.http_address)
+        cfg.flush()  # Debounced, write before the patch goes away
+
+    save.assert_called_once()
+
+    assert cfg.get_nested("hardware", "num_leds") == NUM_LEDS
+    assert cfg.get_nested("hardware", "color_order") == "GRB"
+    assert cfg.get_nested("network", "hostname") == "127.0.0.1"
+
+
+def test_synced_config_drives_udp_transmitter(device):
+    """Sync, build the transmitter the app would, and get a frame through"""
+    cfg = ConfigManager()
+    cfg.config["client"]["connection_type"] = "udp"
+    cfg.config["client"]["record_path"] = None
+    cfg.config["network"]["udp_port"] = device.udp_port  # Fixed on the firmware
+
+    with patch.object(cfg, "_save_local_config"):
+        cfg.sync_with_esp(address=device.http_address)
+        cfg.flush()
+
+    tx = AmbilightApp._build_transmitter(SimpleNamespace(config_mgr=cfg))
+    assert isinstance(tx, UdpTransmitter)
+
+    frame = bytes([9]) * (cfg.get_nested("hardware", "num_leds") * 3)
+    assert tx.send_colors(frame)
+    assert device.wait_for_frame() == frame
+    tx.disconnect()
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_serial_transmitter_over_pty():
+    with DeviceEmulator(num_leds=NUM_LEDS) as dev:
+        with patch("src.transmitters.serial_transmitter.time.sleep"):
+            tx = SerialTransmitter(dev.serial_port, 115200)
+
+        frame = bytes([42]) * (NUM_LEDS * 3)
+        tx.send_colors(frame)
+        assert dev.wait_for_frame() == frame
+        tx.disconnect()
@@ -0,0 +1,24 @@
+import numpy as np
+
+from src.dithering import TemporalDither
+
+
+def test_average_over_frames_matches_precise_value():
+    """Dark values between two 8-bit steps average out exactly"""
+    dither = TemporalDither()
+    values = np.array([[0.25, 1.5, 3.75]], dtype=np.float32)
+
+    frames = [dither.quantize(values) for _ in range(100)]
+
+    assert np.allclose(np.mean(frames, axis=0), values, atol=0.02)
+    assert frames[0].dtype == np.uint8
+
+
+def test_clipped_values_do_not_accumulate_error():
+    dither = TemporalDither()
+    for _ in range(50):
+        out = dither.quantize(np.array([[300.0, -20.0, 255.0]], dtype=np.float32))
+
+    assert out.tolist() == [[255, 0, 255]]
+    out = dither.quantize(np.array([[128.0, 128.0, 128.0]], dtype=np.float32))
+    assert out.tolist() == [[128, 128, 128]]
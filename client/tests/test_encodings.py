@@ -0,0 +1,99 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.device_emulator import DeviceEmulator
+from src.transmitters import encodings
+from src.transmitters.serial_transmitter import SerialTransmitter
+
+NUM_LEDS = 300
+
+
+def _random_frame(seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, NUM_LEDS * 3, dtype=np.uint8).tobytes()
+
+
+def _decode_packet(packet, prev):
+    """Parses one 'Adz' packet with the reference decoder"""
+    magic, enc, length, checksum = encodings.PACKET_HEADER.unpack_from(packet)
+    assert magic == encodings.PACKET_MAGIC
+    assert checksum == enc ^ (length >> 8) ^ (length & 0xFF) ^ 0x55
+    payload = packet[encodings.PACKET_HEADER.size :]
+    assert len(payload) == length
+    return enc, encodings.decode_payload(enc, payload, prev)
+
+
+def test_rle_is_lossless_with_long_runs():
+    frame = bytes([10, 20, 30]) * 280 + _random_frame(1)[:60]
+    payload = encodings.encode_rle(frame)
+    assert encodings.decode_rle(payload) == frame
+    assert len(payload) < len(frame) // 10
+
+
+def test_delta_is_lossless():
+    prev = _random_frame(2)
+    frame = bytearray(prev)
+    frame[30:60] = bytes(30)
+    frame[600:603] = b"\x01\x02\x03"
+    payload = encodings.encode_delta(bytes(frame), prev)
+    assert encodings.decode_delta(payload, prev) == bytes(frame)
+    assert len(payload) == 4 + 30 + 4 + 3
+
+
+def test_rgb565_error_is_bounded():
+    frame = _random_frame(3)
+    decoded = encodings.decode_rgb565(encodings.encode_rgb565(frame))
+    err = np.abs(
+        np.frombuffer(decoded, np.uint8).astype(int)
+        - np.frombuffer(frame, np.uint8).astype(int)
+    ).reshape(-1, 3)
+    assert err[:, [0, 2]].max() <= 4
+    assert err[:, 1].max() <= 2
+
+
+def test_encoder_tracks_device_state():
+    encoder = encodings.FrameEncoder(encodings.LOSSLESS_ENCODINGS)
+    device = None
+    frames = [_random_frame(4), bytes(NUM_LEDS * 3)]
+    frames.append(frames[-1][:-3] + b"\xff\xff\xff")
+
+    for frame in frames:
+        _, device = _decode_packet(encoder.encode(frame), device)
+        assert device == frame
+
+    # Unchanged frame, nothing to send
+    assert encoder.encode(frames[-1]) is None
+
+
+def test_static_picture_still_gets_key_frames():
+    """A corrupted delta followed by a frozen picture is repaired"""
+    encoder = encodings.FrameEncoder([encodings.ENC_DELTA], keyframe_interval=10)
+    frame = _random_frame(5)
+    encoder.encode(frame)
+
+    packets = [encoder.encode(frame) for _ in range(25)]
+    sent = [p for p in packets if p is not None]
+
+    assert len(sent) == 2
+    assert all(p[3] == encodings.ENC_RGB888 for p in sent)
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_high_speed_handshake_with_emulator():
+    frames = [bytes([i]) * (NUM_LEDS * 3) for i in (1, 2)]
+    frames.append(frames[-1][:30] + bytes([9]) * 30 + frames[-1][60:])
+
+    with DeviceEmulator(num_leds=NUM_LEDS) as dev:
+        with patch("src.transmitters.serial_transmitter.time.sleep"):
+            tx = SerialTransmitter(dev.serial_port, 115200, high_speed=True)
+
+        assert tx.encoder is not None
+        assert tx.active_baud == 2000000
+
+        for frame in frames:
+            tx.send_colors(frame)
+            assert dev.wait_for_frame() == frame
+        tx.disconnect()
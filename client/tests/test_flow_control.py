@@ -0,0 +1,127 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.device_emulator import DeviceEmulator
+from src.transmitters.flow_control import CreditWindow
+from src.transmitters.serial_transmitter import SerialTransmitter
+
+NUM_LEDS = 30
+
+
+def test_window_limits_frames_in_flight():
+    flow = CreditWindow(window=2)
+
+    for _ in range(2):
+        assert flow.has_credit()
+        flow.on_sent()
+    assert not flow.has_credit()
+
+    assert flow.feed(b"Mode changed to: off\r\nFc1\r\n") == 1
+    assert flow.has_credit()
+
+
+def test_credits_split_across_reads():
+    flow = CreditWindow(window=2)
+    flow.on_sent()
+    flow.on_sent()
+
+    assert flow.feed(b"F") == 0
+    assert flow.feed(b"c2\r\nFcX\r\n") == 2
+    assert flow.in_flight == 0
+
+
+def test_expire_resets_the_window():
+    flow = CreditWindow(window=1)
+    flow.on_sent()
+    flow.expire()
+
+    assert flow.has_credit()
+    assert flow.timeouts == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_send_rate_follows_device():
+    """A 50 fps strip paces the sender, nothing piles up or gets dropped"""
+    with DeviceEmulator(num_leds=NUM_LEDS, max_fps=50) as dev:
+        with patch("src.transmitters.serial_transmitter.time.sleep"):
+            tx = SerialTransmitter(
+                dev.serial_port, 115200, flow_control=True, flow_window=2
+            )
+        assert tx.flow is not None
+
+        peak = 0
+        deadline = time.monotonic() + 0.5
+        i = 0
+        while time.monotonic() < deadline:
+            assert tx.send_colors(bytes([i % 256]) * (NUM_LEDS * 3))
+            peak = max(peak, tx.flow.in_flight)
+            i += 1
+        tx.disconnect()
+
+        stats = tx.flow_stats()
+        assert peak <= 2
+        assert stats["stalls"] > 0
+        assert stats["timeouts"] == 0
+        assert stats["frames_sent"] == i
+        assert i <= 0.5 * 50 + 4
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_black_frame_after_burst_is_delivered():
+    """The exit/idle frame must never be dropped by a full window"""
+    black = bytes(NUM_LEDS * 3)
+    with DeviceEmulator(num_leds=NUM_LEDS, max_fps=30) as dev:
+        with patch("src.transmitters.serial_transmitter.time.sleep"):
+            tx = SerialTransmitter(
+                dev.serial_port, 115200, flow_control=True, flow_window=2
+            )
+        for i in range(20):
+            tx.send_colors(bytes([i + 1]) * (NUM_LEDS * 3))
+        assert tx.send_colors(black)
+        tx.disconnect()
+
+        deadline = time.monotonic() + 1.0
+        while dev.leds != black and time.monotonic() < deadline:
+            dev.wait_for_frame(0.1)
+        assert dev.leds == black
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_corrupt_adalight_packet_is_credited():
+    """A bad checksum costs one frame, not a stalled window"""
+    with DeviceEmulator(num_leds=NUM_LEDS) as dev:
+        with patch("src.transmitters.serial_transmitter.time.sleep"):
+            tx = SerialTransmitter(
+                dev.serial_port, 115200, flow_control=True, flow_window=2
+            )
+
+        # Two packets the device will reject (wrong header checksum)
+        for _ in range(2):
+            tx.ser.write(b"Ada\x00\x1d\x00" + bytes(NUM_LEDS * 3))
+            tx.flow.on_sent()
+
+        start = time.monotonic()
+        frame = bytes([5]) * (NUM_LEDS * 3)
+        assert tx.send_colors(frame)
+        assert time.monotonic() - start < tx.flow.ack_timeout
+        assert dev.wait_for_frame() == frame
+        assert tx.flow.timeouts == 0
+        assert dev.stats.corrupt_packets == 2
+        tx.disconnect()
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_old_firmware_falls_back_to_unacknowledged():
+    with DeviceEmulator(num_leds=NUM_LEDS) as dev:
+        del dev.parser.command_handlers["flow"]
+        with patch("src.transmitters.serial_transmitter.time.sleep"):
+            tx = SerialTransmitter(dev.serial_port, 115200, flow_control=True)
+
+        assert tx.flow is None
+        frame = bytes([7]) * (NUM_LEDS * 3)
+        tx.send_colors(frame)
+        assert dev.wait_for_frame() == frame
+        tx.disconnect()
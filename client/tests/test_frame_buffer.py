@@ -0,0 +1,33 @@
+from src.frame_buffer import FrameBuffer
+
+
+def test_starts_empty():
+    seq, frame, layout = FrameBuffer().latest()
+
+    assert seq == 0
+    assert frame == b""
+    assert layout == (0, 0, 0, 0)
+
+
+def test_publish_bumps_sequence_and_keeps_newest():
+    buffer = FrameBuffer()
+    buffer.publish(b"\x01" * 6, (1, 1, 0, 0))
+    seq_first = buffer.latest()[0]
+    buffer.publish(b"\x02" * 9, (1, 1, 1, 0))
+
+    seq, frame, layout = buffer.latest()
+    assert seq == seq_first + 1
+    assert frame == b"\x02" * 9
+    assert layout == (1, 1, 1, 0)
+
+
+def test_reader_can_skip_frames_it_drew():
+    buffer = FrameBuffer()
+    buffer.publish(b"\x01" * 3, (1, 0, 0, 0))
+    drawn_seq = buffer.latest()[0]
+
+    # Same frame read twice, nothing new to draw
+    assert buffer.latest()[0] == drawn_seq
+
+    buffer.publish(b"\x01" * 3, (1, 0, 0, 0))
+    assert buffer.latest()[0] != drawn_seq
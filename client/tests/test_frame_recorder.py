@@ -0,0 +1,103 @@
+import threading
+import zlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.frame_recorder import FOOTER, FrameReader, FrameRecorder, FrameReplayer
+
+
+def _make_frames(count, num_leds=30):
+    frames = []
+    for i in range(count):
+        frame = bytearray(num_leds * 3)
+        frame[(i * 3) % len(frame)] = i % 256  # One LED changes per frame
+        frames.append(bytes(frame))
+    return frames
+
+
+def test_roundtrip_across_blocks(tmp_path):
+    """Frames and timestamps come back exactly, across block boundaries"""
+    path = str(tmp_path / "session.rec")
+    frames = _make_frames(25)
+
+    with FrameRecorder(path, frames_per_block=10) as rec:
+        for i, frame in enumerate(frames):
+            rec.write_frame(frame, timestamp=100.0 + i * 0.1)
+
+    with FrameReader(path) as reader:
+        assert len(reader) == 25
+        assert len(reader.index) == 3
+        decoded = list(reader.frames())
+
+    assert [f for _, f in decoded] == frames
+    assert decoded[0][0] == 0.0
+    assert decoded[-1][0] == pytest.approx(2.4)
+
+
+def test_seek_and_led_count_change(tmp_path):
+    path = str(tmp_path / "session.rec")
+
+    with FrameRecorder(path, frames_per_block=4) as rec:
+        for i in range(10):
+            num_leds = 10 if i < 5 else 20  # Layout changed mid-session
+            rec.write_frame(bytes([i]) * (num_leds * 3), timestamp=float(i))
+
+    with FrameReader(path) as reader:
+        decoded = list(reader.frames(start_time=6.0))
+
+    assert [ts for ts, _ in decoded] == [6.0, 7.0, 8.0, 9.0]
+    assert decoded[0][1] == bytes([6]) * 60
+
+
+def test_unclosed_recording_is_recovered(tmp_path):
+    """A crash before close() loses only the pending block
+    (full blocks are on disk once the writer thread got to them)"""
+    path = str(tmp_path / "session.rec")
+    rec = FrameRecorder(path, frames_per_block=5)
+    for i in range(12):
+        rec.write_frame(bytes([i]) * 9, timestamp=float(i))
+    rec.flush()
+
+    with FrameReader(path) as reader:
+        assert len(reader) == 10
+
+    rec.close()
+    with open(path, "rb") as f:
+        assert f.read()[-FOOTER.size :].endswith(b"AMBIDX01")
+
+
+def test_replayer_streams_to_transmitter(tmp_path):
+    path = str(tmp_path / "session.rec")
+    frames = _make_frames(8)
+    with FrameRecorder(path) as rec:
+        for i, frame in enumerate(frames):
+            rec.write_frame(frame, timestamp=i * 0.5)
+
+    transmitter = MagicMock()
+    sent = FrameReplayer(path, transmitter, speed=0).play()
+
+    assert sent == 8
+    assert [c.args[0] for c in transmitter.send_colors.call_args_list] == frames
+
+
+def test_blocks_are_compressed_off_the_calling_thread(tmp_path):
+    path = str(tmp_path / "session.rec")
+    threads = []
+    real_compress = zlib.compress
+
+    def compress(data, level):
+        threads.append(threading.current_thread())
+        return real_compress(data, level)
+
+    with (
+        patch("src.frame_recorder.zlib.compress", side_effect=compress),
+        FrameRecorder(path, frames_per_block=2) as rec,
+    ):
+        for i in range(4):
+            rec.write_frame(bytes([i]) * 9, timestamp=float(i))
+
+    assert len(threads) == 2
+    assert threading.current_thread() not in threads
+    with FrameReader(path) as reader:
+        assert len(reader) == 4
@@ -0,0 +1,33 @@
+import json
+
+from src.frame_tracer import FrameTracer
+
+
+def test_stages_and_chrome_trace_export(tmp_path):
+    tracer = FrameTracer()
+
+    for _ in range(3):
+        tracer.begin_frame()
+        tracer.mark("grab")
+        tracer.mark("sample")
+        tracer.mark("transmit")
+        tracer.end_frame()
+
+    # A failed grab must not show up in the stats
+    tracer.begin_frame()
+    tracer.mark("grab")
+    tracer.discard_frame()
+
+    stats = tracer.stats()
+    assert set(stats) == {"grab", "sample", "transmit", "total"}
+    assert stats["total"]["count"] == 3
+
+    path = tmp_path / "trace.json"
+    tracer.export_chrome_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+
+    frames = [e for e in events if e["name"] == "frame"]
+    stages = [e for e in events if e.get("cat") == "stage"]
+    assert len(frames) == 3
+    assert [e["name"] for e in stages[:3]] == ["grab", "sample", "transmit"]
+    assert stages[0]["ts"] == frames[0]["ts"]
@@ -0,0 +1,103 @@
+import pytest
+
+from src.frame_buffer import FrameBuffer
+
+pytest.importorskip("customtkinter")
+
+from src.ui.led_preview import LedPreview
+
+
+class FakeCanvas:
+    """Records what LedPreview draws, no Tk display needed"""
+
+    def __init__(self, width=200, height=120):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self.fills = {}
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def delete(self, tag):
+        self.items.clear()
+
+    def create_rectangle(self, x0, y0, x1, y1, **kwargs):
+        item = len(self.items) + 1
+        self.items[item] = (x0, y0, x1, y1)
+        return item
+
+    def itemconfigure(self, item, fill):
+        self.fills[item] = fill
+
+
+def make_preview(frame_buffer=None):
+    """LedPreview without its Tk widget, only the drawing logic"""
+    preview = LedPreview.__new__(LedPreview)
+    preview.frame_buffer = frame_buffer or FrameBuffer()
+    preview.canvas = FakeCanvas()
+    preview._rects = []
+    preview._layout = None
+    preview._drawn = None
+    preview._drawn_seq = -1
+    preview.interval_ms = 50
+    preview.after = lambda ms, callback: None
+    preview.winfo_ismapped = lambda: True
+    return preview
+
+
+def centers(preview):
+    result = []
+    for rect in preview._rects:
+        x0, y0, x1, y1 = preview.canvas.items[rect]
+        result.append(((x0 + x1) / 2, (y0 + y1) / 2))
+    return result
+
+
+def test_rebuild_follows_strip_order():
+    preview = make_preview()
+    preview._rebuild((2, 3, 2, 3))
+
+    points = centers(preview)
+    assert len(points) == 10
+    left, top, right, bottom = points[:2], points[2:5], points[5:7], points[7:]
+
+    # Left bottom->top, top left->right, right top->bottom, bottom right->left
+    assert left[0][1] > left[1][1] and left[0][0] == left[1][0] == 24
+    assert [p[0] for p in top] == sorted(p[0] for p in top)
+    assert all(p[1] == 24 for p in top)
+    assert right[0][1] < right[1][1] and right[0][0] == 200 - 24
+    assert [p[0] for p in bottom] == sorted((p[0] for p in bottom), reverse=True)
+    assert all(p[1] == 120 - 24 for p in bottom)
+
+
+def test_rebuild_skips_tiny_canvas():
+    preview = make_preview()
+    preview.canvas = FakeCanvas(width=40, height=40)
+    preview._rebuild((2, 2, 2, 2))
+
+    assert preview._rects == []
+
+
+def test_refresh_recolors_only_changed_leds():
+    buffer = FrameBuffer()
+    preview = make_preview(buffer)
+    layout = (1, 1, 1, 1)
+
+    buffer.publish(bytes([255, 0, 0]) * 4, layout)
+    preview._refresh()
+    assert len(preview.canvas.fills) == 4
+    assert set(preview.canvas.fills.values()) == {"#ff0000"}
+
+    preview.canvas.fills.clear()
+    buffer.publish(bytes([255, 0, 0]) * 3 + bytes([0, 0, 255]), layout)
+    preview._refresh()
+    assert preview.canvas.fills == {preview._rects[3]: "#0000ff"}
+
+    # Nothing new published, nothing redrawn
+    preview.canvas.fills.clear()
+    preview._refresh()
+    assert preview.canvas.fills == {}
@@ -0,0 +1,141 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.config_manager import ConfigManager
+from src.display_watcher import DisplayWatcher
+from src.frame_tracer import FrameTracer
+from src.screen_grabber import ScreenGrabber
+
+
+def make_monitor(width, height, left=0):
+    return {"left": left, "top": 0, "width": width, "height": height}
+
+
+@pytest.fixture
+def grabber():
+    cfg = ConfigManager()
+    cfg._save_local_config = MagicMock()  # Keep test settings off disk
+    cfg.set_nested("client", "dithering", False)
+    cfg.set_nested("client", "gamma", 1.0)
+    cfg.set_nested("client", "depth", 4)
+    cfg.set_nested("client", "layout", {"left": 2, "top": 3, "right": 2, "bottom": 3})
+
+    grab = ScreenGrabber(cfg)
+    grab.sct = MagicMock()
+    grab.sct.monitors = [make_monitor(32, 16), make_monitor(32, 16)]
+    grab.sct.grab.side_effect = lambda m: np.full(
+        (m["height"], m["width"], 4), 200, dtype=np.uint8
+    )
+    return grab
+
+
+def test_matches_manual_area_average(grabber):
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 256, (16, 32, 4), dtype=np.uint8)
+    grabber.sct.grab.side_effect = lambda m: img
+
+    frame = grabber.get_frame_bytes()
+    colors = np.frombuffer(frame, dtype=np.uint8).reshape(-1, 3)
+
+    # Left side, wired bottom -> top: first LED is the lower half
+    lower_left = img[8:, :4, 2::-1].reshape(-1, 3).mean(axis=0)
+    assert np.abs(colors[0] - np.rint(lower_left)).max() <= 1
+    # Bottom side, wired right -> left: last LED is the leftmost third
+    bottom_left = img[-4:, :10, 2::-1].reshape(-1, 3).mean(axis=0)
+    assert np.abs(colors[-1] - np.rint(bottom_left)).max() <= 1
+    assert len(colors) == 10
+
+
+def test_geometry_is_cached_between_frames(grabber):
+    grabber.get_frame_bytes()
+    zones = grabber._zones
+
+    with patch("src.screen_grabber.monitor_rects") as rects:
+        grabber.get_frame_bytes()
+
+    rects.assert_not_called()
+    assert grabber._zones is zones
+
+
+def test_display_change_rebuilds_geometry(grabber):
+    grabber.get_frame_bytes()
+    assert grabber._monitor["width"] == 32
+
+    # Watcher thread reports a new resolution
+    grabber._on_displays_changed(((0, 0, 64, 24), (0, 0, 64, 24)))
+    frame = grabber.get_frame_bytes()
+
+    assert grabber._monitor == make_monitor(64, 24)
+    assert len(frame) == 10 * 3
+    grabber.sct.grab.assert_called_with(make_monitor(64, 24))
+
+
+def test_missing_monitor_falls_back_to_first(grabber):
+    grabber.cfg.set_nested("client", "monitor_index", 5)
+    grabber.get_frame_bytes()
+
+    assert grabber._monitor == make_monitor(32, 16)
+
+
+def test_watcher_reports_only_changes():
+    seen = []
+    watcher = DisplayWatcher(seen.append)
+
+    with patch("src.display_watcher.read_monitors") as read:
+        read.return_value = ((0, 0, 32, 16), (0, 0, 32, 16))
+        assert watcher.poll()
+        assert not watcher.poll()
+
+        read.return_value = ((0, 0, 64, 16), (0, 0, 32, 16), (32, 0, 32, 16))
+        assert watcher.poll()
+
+    assert len(seen) == 2
+
+
+def test_monitor_zero_captures_all_screens(grabber):
+    grabber.sct.monitors = [make_monitor(64, 16), make_monitor(32, 16)]
+    grabber.cfg.set_nested("client", "monitor_index", 0)
+    grabber.get_frame_bytes()
+
+    assert grabber._monitor == make_monitor(64, 16)
+
+
+def test_watcher_survives_read_errors():
+    watcher = DisplayWatcher(lambda monitors: None, interval=0.01)
+
+    with patch("src.display_watcher.read_monitors", side_effect=OSError("gone")):
+        watcher.start()
+        time.sleep(0.05)
+        assert watcher._thread.is_alive()
+        watcher.stop()
+
+
+def test_trace_stages_end_with_quantize(grabber):
+    grabber.tracer = FrameTracer()
+    grabber.tracer.begin_frame()
+    grabber.get_frame_bytes()
+    grabber.tracer.end_frame()
+
+    assert set(grabber.tracer.stats()) == {"grab", "sample", "quantize", "total"}
+
+
+def test_paused_watcher_stops_polling_and_resumes_at_once():
+    watcher = DisplayWatcher(lambda monitors: None, interval=0.05)
+
+    with patch("src.display_watcher.read_monitors", return_value=()) as read:
+        watcher.start()
+        watcher.pause()
+        time.sleep(0.2)
+        assert read.call_count <= 1  # At most one poll was already due
+
+        polls = read.call_count
+        watcher.interval = 10.0
+        watcher.resume()
+        time.sleep(0.05)
+        assert read.call_count == polls + 1
+        watcher.stop()
+        watcher._thread.join(timeout=1.0)
+        assert not watcher._thread.is_alive()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.smoothing import TemporalSmoother
+
+
+def _frame(value, num_leds=20):
+    return np.full((num_leds, 3), value, dtype=np.uint8)
+
+
+def test_small_changes_are_smoothed():
+    smoother = TemporalSmoother(strength=0.8, cut_threshold=40)
+    smoother.process(_frame(100))
+
+    out = smoother.process(_frame(110))
+
+    assert np.allclose(out, 102)
+    assert smoother.cuts == 0
+
+
+def test_scene_cut_bypasses_smoothing():
+    smoother = TemporalSmoother(strength=0.9, cut_threshold=40)
+    smoother.process(_frame(10))
+    smoother.process(_frame(12))
+
+    out = smoother.process(_frame(200))
+
+    assert np.array_equal(out, _frame(200))
+    assert smoother.cuts == 1
+
+    # Heavy smoothing resumes right after the cut
+    out = smoother.process(_frame(210))
+    assert np.allclose(out, 201)
+
+
+def test_led_count_change_restarts():
+    smoother = TemporalSmoother(strength=0.9)
+    smoother.process(_frame(50, num_leds=10))
+
+    out = smoother.process(_frame(60, num_leds=12))
+
+    assert out.shape == (12, 3)
+    assert np.array_equal(out, _frame(60, num_leds=12))